@@ -0,0 +1,201 @@
+import os
+import gc
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from openai_kokoro_tts.onnx_tts_handler import (
+    DEFAULT_MODEL_PATH,
+    DEFAULT_TUNING_CONFIG_PATH,
+    SAMPLE_RATE,
+    OnnxTTSHandler,
+)
+
+# Representative request mix: short replies, a typical sentence and a paragraph
+BENCHMARK_TEXTS = [
+    "Okay.",
+    "Your order has shipped and should arrive on Thursday.",
+    "Thanks for calling. Please note that our opening hours have changed, "
+    "and the support line is now available from eight in the morning until six in the evening.",
+    "The quick brown fox jumps over the lazy dog while the band plays on, "
+    "and nobody in the crowded square seems to notice the rain that has started to fall. "
+    "Later that evening, the streets are quiet again, and the lamps flicker on one by one.",
+]
+
+
+def default_grid(cpu_count=None):
+    """
+    Build the default (intra_op_threads, session_count) grid for this host.
+
+    Thread counts are powers of two up to the core count, and combinations that
+    would oversubscribe the cores (threads * sessions > cores) are skipped.
+
+    Args:
+        cpu_count (int, optional): Number of cores (default: os.cpu_count()).
+
+    Returns:
+        list[tuple[int, int]]: Configurations to benchmark.
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    counts = sorted({2 ** i for i in range(cpu_count.bit_length()) if 2 ** i <= cpu_count} | {cpu_count})
+    return [(threads, sessions) for threads in counts for sessions in counts if threads * sessions <= cpu_count]
+
+
+def benchmark_config(model_path, intra_op_threads, session_count, texts=None, rounds=3):
+    """
+    Measure throughput and latency of one configuration.
+
+    Requests are issued with ``session_count`` concurrent clients so every session stays busy.
+
+    Args:
+        model_path (str): Path to the ONNX model.
+        intra_op_threads (int): Threads per session for intra-op parallelism.
+        session_count (int): Number of ONNX Runtime sessions.
+        texts (list[str], optional): Benchmark inputs (default: BENCHMARK_TEXTS).
+        rounds (int, optional): Times each input is synthesized (default: 3).
+
+    Returns:
+        dict: The configuration with throughput (audio seconds per wall second)
+            and p50/p95 latency in seconds.
+    """
+    texts = texts or BENCHMARK_TEXTS
+    handler = OnnxTTSHandler(
+        model_path=model_path,
+        intra_op_threads=intra_op_threads,
+        inter_op_threads=1,
+        session_count=session_count,
+    )
+
+    def timed(text):
+        start = time.perf_counter()
+        audio = handler.synthesize(text)
+        return time.perf_counter() - start, audio.size
+
+    try:
+        with ThreadPoolExecutor(max_workers=session_count) as pool:
+            # Warm up every session before measuring
+            list(pool.map(timed, [texts[0]] * session_count))
+
+            start = time.perf_counter()
+            results = list(pool.map(timed, texts * rounds))
+            wall_seconds = time.perf_counter() - start
+    finally:
+        del handler
+        gc.collect()
+
+    latencies = np.array([latency for latency, _ in results])
+    audio_seconds = sum(samples for _, samples in results) / SAMPLE_RATE
+    return {
+        "intra_op_threads": intra_op_threads,
+        "inter_op_threads": 1,
+        "session_count": session_count,
+        "throughput": audio_seconds / wall_seconds,
+        "p50_latency": float(np.percentile(latencies, 50)),
+        "p95_latency": float(np.percentile(latencies, 95)),
+    }
+
+
+def select_best(results, latency_slo):
+    """
+    Pick the highest-throughput result whose p95 latency meets the SLO.
+
+    Falls back to the lowest p95 latency if no configuration meets it.
+
+    Args:
+        results (list[dict]): Output of benchmark_config for each configuration.
+        latency_slo (float): Maximum acceptable p95 latency in seconds.
+
+    Returns:
+        dict: The chosen result.
+    """
+    within_slo = [result for result in results if result["p95_latency"] <= latency_slo]
+    if within_slo:
+        return max(within_slo, key=lambda result: result["throughput"])
+    logging.warning(f"No configuration met the {latency_slo}s p95 latency SLO; choosing the fastest.")
+    return min(results, key=lambda result: result["p95_latency"])
+
+
+def autotune(model_path=None, output_path=None, grid=None, latency_slo=None, texts=None, rounds=3):
+    """
+    Benchmark a grid of ONNX Runtime configurations and persist the best one.
+
+    The written file is picked up by OnnxTTSHandler on subsequent starts.
+
+    Args:
+        model_path (str, optional): Path to the ONNX model (default: ONNX_MODEL_PATH).
+        output_path (str, optional): Where to write the result (default: ORT_TUNING_CONFIG
+            or DEFAULT_TUNING_CONFIG_PATH).
+        grid (list[tuple[int, int]], optional): (intra_op_threads, session_count)
+            pairs to try (default: default_grid()).
+        latency_slo (float, optional): p95 latency SLO in seconds (default: AUTOTUNE_LATENCY_SLO or 2.0).
+        texts (list[str], optional): Benchmark inputs (default: BENCHMARK_TEXTS).
+        rounds (int, optional): Times each input is synthesized per configuration.
+
+    Returns:
+        dict: The persisted tuning config.
+    """
+    model_path = model_path or os.getenv("ONNX_MODEL_PATH", DEFAULT_MODEL_PATH)
+    output_path = output_path or os.getenv("ORT_TUNING_CONFIG", DEFAULT_TUNING_CONFIG_PATH)
+    latency_slo = latency_slo or float(os.getenv("AUTOTUNE_LATENCY_SLO", 2.0))
+    grid = grid or default_grid()
+
+    results = []
+    for intra_op_threads, session_count in grid:
+        result = benchmark_config(model_path, intra_op_threads, session_count, texts=texts, rounds=rounds)
+        logging.info(
+            f"threads={intra_op_threads} sessions={session_count}: "
+            f"{result['throughput']:.2f}x realtime, p95 {result['p95_latency']:.3f}s"
+        )
+        results.append(result)
+
+    best = select_best(results, latency_slo)
+    config = {
+        "params": {
+            "intra_op_threads": best["intra_op_threads"],
+            "inter_op_threads": best["inter_op_threads"],
+            "session_count": best["session_count"],
+        },
+        "model_path": model_path,
+        "cpu_count": os.cpu_count(),
+        "latency_slo": latency_slo,
+        "results": results,
+    }
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(config, f, indent=2)
+    logging.info(f"Saved tuning config {config['params']} to {output_path}")
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auto-tune ONNX Runtime threading for the Kokoro TTS server.")
+    parser.add_argument("--model_path", type=str, default=None, help="Path to the ONNX model (default: $ONNX_MODEL_PATH).")
+    parser.add_argument("--output", type=str, default=None,
+                        help=f"Where to save the tuning config (default: $ORT_TUNING_CONFIG or {DEFAULT_TUNING_CONFIG_PATH}).")
+    parser.add_argument("--latency_slo", type=float, default=None, help="p95 latency SLO in seconds (default: 2.0).")
+    parser.add_argument("--threads", type=int, nargs="+", default=None, help="Intra-op thread counts to try.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=None, help="Session counts to try.")
+    parser.add_argument("--rounds", type=int, default=3, help="Times each benchmark input is synthesized (default: 3).")
+    args = parser.parse_args()
+
+    grid = None
+    if args.threads or args.sessions:
+        cpu_count = os.cpu_count() or 1
+        grid = [
+            (threads, sessions)
+            for threads in (args.threads or [cpu_count])
+            for sessions in (args.sessions or [1])
+        ]
+
+    logging.basicConfig(level=logging.INFO)
+    config = autotune(args.model_path, args.output, grid=grid, latency_slo=args.latency_slo, rounds=args.rounds)
+    print(json.dumps(config["params"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import logging
+import threading
+
+
+class _Flight:
+    """
+    State shared by all callers waiting on one in-progress computation.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.chunks = []
+        self.result = None
+        self.error = None
+        self.done = False
+        self.subscribers = 1
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical requests onto a single computation.
+
+    The first caller for a key starts the work; callers arriving while it is
+    in flight wait for it and receive the same result (or exception). Once the
+    flight finishes the key is released, so later requests start fresh work
+    (and can be served by the synthesis caches instead).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def _join(self, key):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                with flight.condition:
+                    flight.subscribers += 1
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            self.started += 1
+            return flight, True
+
+    def _finish(self, key, flight):
+        with self._lock:
+            self._flights.pop(key, None)
+        with flight.condition:
+            flight.done = True
+            flight.condition.notify_all()
+        if flight.subscribers > 1:
+            logging.debug(f"Served {flight.subscribers} identical requests with one synthesis.")
+
+    def do(self, key, fn):
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key (Hashable): Identity of the request.
+            fn (callable): Zero-argument function computing the result.
+
+        Returns:
+            The result of ``fn``, shared by every coalesced caller.
+        """
+        flight, leader = self._join(key)
+        if leader:
+            try:
+                flight.result = fn()
+            except Exception as e:
+                flight.error = e
+                raise
+            finally:
+                self._finish(key, flight)
+            return flight.result
+
+        with flight.condition:
+            flight.condition.wait_for(lambda: flight.done)
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stream(self, key, fn):
+        """
+        Iterate the chunks of a coalesced streaming computation.
+
+        ``fn`` returns an iterable of chunks and is consumed in a background
+        thread, so a subscriber that disconnects does not stall the others.
+        Subscribers joining mid-stream first receive the chunks produced so
+        far, then follow the live stream.
+
+        Args:
+            key (Hashable): Identity of the request.
+            fn (callable): Zero-argument function returning an iterable of chunks.
+
+        Yields:
+            Chunks in production order. If production fails, the exception is
+            raised after the chunks produced before the failure.
+        """
+        flight, leader = self._join(key)
+        if leader:
+            threading.Thread(target=self._produce, args=(key, flight, fn), daemon=True).start()
+
+        index = 0
+        while True:
+            with flight.condition:
+                flight.condition.wait_for(lambda: index < len(flight.chunks) or flight.done)
+                pending = flight.chunks[index:]
+                done = flight.done
+            for chunk in pending:
+                yield chunk
+            index += len(pending)
+            if done and index == len(flight.chunks):
+                break
+
+        if flight.error is not None:
+            raise flight.error
+
+    def _produce(self, key, flight, fn):
+        try:
+            for chunk in fn():
+                with flight.condition:
+                    flight.chunks.append(chunk)
+                    flight.condition.notify_all()
+        except Exception as e:
+            logging.error(f"Error during coalesced stream production: {e}")
+            flight.error = e
+        finally:
+            self._finish(key, flight)
+
+    def stats(self):
+        """
+        Report how many computations were started and how many requests joined one.
+
+        Returns:
+            dict: Started and coalesced request counts.
+        """
+        with self._lock:
+            return {
+                "flights_started": self.started,
+                "requests_coalesced": self.coalesced,
+                "flights_in_progress": len(self._flights),
+            }
@@ -0,0 +1,218 @@
+import os
+import time
+import wave
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from openai_kokoro_tts.segment_cache import split_sentences
+from openai_kokoro_tts.streaming import PCM16_ENCODE_BYTES_PER_SAMPLE, to_pcm16
+
+# Typical speaking rate, used to estimate output length from input length
+CHARS_PER_SECOND = 15
+
+# Upper bound on bytes held per output sample by the buffered path: float32
+# samples, the float32 scaling temporary, int16 PCM, the WAV buffer and the
+# returned bytes. The per-sentence segments and their stitched copy (4 + 4) are
+# released before encoding starts, so they fit within it.
+BUFFERED_BYTES_PER_SAMPLE = 4 + 4 + 2 + 2 + 2
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    """Raised when a request cannot obtain its memory reservation in time."""
+
+
+def estimate_request_bytes(text, sample_rate, speed=1.0):
+    """
+    Estimate the peak bytes a request needs when synthesized in one buffer.
+
+    Args:
+        text (str): The input text.
+        sample_rate (int): Output sampling rate.
+        speed (float, optional): Speaking rate multiplier (default: 1.0).
+
+    Returns:
+        int: Estimated peak bytes.
+    """
+    seconds = len(text or "") / CHARS_PER_SECOND / max(speed, 0.1)
+    return int(seconds * sample_rate * BUFFERED_BYTES_PER_SAMPLE)
+
+
+class RequestMemoryTracker:
+    """
+    Tracks the audio buffers a single request holds and their high-water mark.
+    """
+
+    def __init__(self):
+        self.current_bytes = 0
+        self.peak_bytes = 0
+
+    def allocate(self, nbytes):
+        self.current_bytes += nbytes
+        self.peak_bytes = max(self.peak_bytes, self.current_bytes)
+
+    def release(self, nbytes):
+        self.current_bytes -= nbytes
+
+
+class MemoryBudget:
+    """
+    Global byte budget shared by all in-flight requests.
+
+    Each request reserves its expected peak before synthesizing and waits
+    (up to ``timeout`` seconds) while the budget is exhausted. Requests whose
+    estimate exceeds ``request_max_bytes`` are synthesized incrementally, so
+    they only reserve ``request_max_bytes``.
+    """
+
+    def __init__(self, max_bytes=None, request_max_bytes=None, timeout=None):
+        """
+        Args:
+            max_bytes (int, optional): Global budget (default: GLOBAL_MEMORY_BUDGET_BYTES or 256 MiB).
+            request_max_bytes (int, optional): Per-request budget
+                (default: REQUEST_MEMORY_BUDGET_BYTES or 32 MiB).
+            timeout (float, optional): Seconds to wait for a reservation
+                (default: MEMORY_BUDGET_TIMEOUT or 30).
+        """
+        self.max_bytes = max_bytes or int(os.getenv("GLOBAL_MEMORY_BUDGET_BYTES", 256 * 1024 * 1024))
+        self.request_max_bytes = request_max_bytes or int(
+            os.getenv("REQUEST_MEMORY_BUDGET_BYTES", 32 * 1024 * 1024)
+        )
+        self.timeout = timeout if timeout is not None else float(os.getenv("MEMORY_BUDGET_TIMEOUT", 30))
+        self._condition = threading.Condition()
+        self.reserved_bytes = 0
+        self.peak_reserved_bytes = 0
+        self.max_request_peak_bytes = 0
+        self.incremental_requests = 0
+        self.waits = 0
+
+    def is_over_budget(self, estimated_bytes):
+        """Whether a request must be processed incrementally."""
+        return estimated_bytes > self.request_max_bytes
+
+    @contextmanager
+    def reserve(self, nbytes):
+        """
+        Hold ``nbytes`` of the global budget for the duration of the block.
+
+        Reservations larger than the whole budget are capped so they can still
+        run on their own.
+
+        Raises:
+            MemoryBudgetExceeded: If the reservation is not granted within the timeout.
+        """
+        nbytes = min(nbytes, self.max_bytes)
+        with self._condition:
+            if self.reserved_bytes + nbytes > self.max_bytes:
+                self.waits += 1
+                granted = self._condition.wait_for(
+                    lambda: self.reserved_bytes + nbytes <= self.max_bytes, timeout=self.timeout
+                )
+                if not granted:
+                    raise MemoryBudgetExceeded("Server memory budget exhausted; try again later.")
+            self.reserved_bytes += nbytes
+            self.peak_reserved_bytes = max(self.peak_reserved_bytes, self.reserved_bytes)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.reserved_bytes -= nbytes
+                self._condition.notify_all()
+
+    def reserved_iter(self, nbytes, make_chunks):
+        """
+        Iterate ``make_chunks()`` while holding a reservation.
+
+        The reservation is taken when iteration starts and released when it
+        ends or the consumer stops early.
+        """
+        with self.reserve(nbytes):
+            yield from make_chunks()
+
+    def record(self, tracker, incremental=False):
+        """Fold one request's high-water mark into the global statistics."""
+        with self._condition:
+            self.max_request_peak_bytes = max(self.max_request_peak_bytes, tracker.peak_bytes)
+            if incremental:
+                self.incremental_requests += 1
+
+    def stats(self):
+        """
+        Report budget usage.
+
+        Returns:
+            dict: Budgets, current and peak reservations, the largest per-request
+                high-water mark, incremental request and wait counts.
+        """
+        with self._condition:
+            return {
+                "memory_budget_bytes": self.max_bytes,
+                "request_memory_budget_bytes": self.request_max_bytes,
+                "memory_reserved_bytes": self.reserved_bytes,
+                "memory_peak_reserved_bytes": self.peak_reserved_bytes,
+                "max_request_peak_bytes": self.max_request_peak_bytes,
+                "incremental_requests": self.incremental_requests,
+                "memory_budget_waits": self.waits,
+            }
+
+
+def encode_wav_incrementally(synthesizer, text, voice=None, speed=1.0, sample_rate=None,
+                             max_chars=None, spool_bytes=None, tracker=None):
+    """
+    Synthesize and encode a WAV file segment by segment.
+
+    Each segment is synthesized, converted to PCM16 and appended to a spooled
+    temporary file before the next one starts, so only one segment's buffers
+    are alive at a time. The file stays in memory up to ``spool_bytes`` and
+    moves to disk beyond that.
+
+    Args:
+        synthesizer: Object with a ``synthesize(text, voice, speed)`` method returning samples.
+        text (str): The input text.
+        voice (str, optional): The voice to use.
+        speed (float, optional): Speaking rate multiplier (default: 1.0).
+        sample_rate (int): Sampling rate of the synthesized audio.
+        max_chars (int, optional): Maximum characters per segment (default: SEGMENT_MAX_CHARS or 400).
+        spool_bytes (int, optional): In-memory size of the output before it spills to disk
+            (default: 8 MiB).
+        tracker (RequestMemoryTracker, optional): Records the request's buffer high-water mark.
+
+    Returns:
+        tempfile.SpooledTemporaryFile: The WAV file, positioned at the start.
+    """
+    max_chars = max_chars or int(os.getenv("SEGMENT_MAX_CHARS", 400))
+    spool_bytes = spool_bytes or 8 * 1024 * 1024
+    tracker = tracker or RequestMemoryTracker()
+
+    segments = split_sentences(text or "", max_chars=max_chars)
+    if not segments:
+        raise ValueError("Input text cannot be empty.")
+
+    output = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+    spooled = 0
+    start = time.perf_counter()
+    with wave.open(output, 'wb') as wav_file:
+        wav_file.setnchannels(1)  # Mono
+        wav_file.setsampwidth(2)  # 16-bit PCM
+        wav_file.setframerate(sample_rate)
+
+        for segment in segments:
+            audio = synthesizer.synthesize(segment, voice=voice, speed=speed)
+            working = audio.nbytes + audio.size * PCM16_ENCODE_BYTES_PER_SAMPLE
+            tracker.allocate(working)
+            wav_file.writeframes(to_pcm16(audio))
+            tracker.release(working)
+            del audio
+
+            # Count the spooled output while it is still held in memory
+            size = output.tell()
+            in_memory = size if size <= spool_bytes else 0
+            tracker.allocate(in_memory - spooled)
+            spooled = in_memory
+
+    output.seek(0)
+    logging.info(
+        f"Incrementally encoded {len(segments)} segments in {time.perf_counter() - start:.2f}s "
+        f"(peak {tracker.peak_bytes} bytes)."
+    )
+    return output
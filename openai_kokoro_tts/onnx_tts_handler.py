@@ -1,32 +1,141 @@
 import os
+import json
+import queue
 import logging
 import numpy as np
 import onnxruntime as ort
 import soundfile as sf
 
+SAMPLE_RATE = 16000
+DEFAULT_MODEL_PATH = "models/kokoro/kokoro.onnx"
+DEFAULT_TUNING_CONFIG_PATH = "models/kokoro/ort_tuning.json"
+
+
+def load_tuning_config(path=None, model_path=None):
+    """
+    Load ONNX Runtime tuning parameters persisted by the auto-tuner.
+
+    A file tuned for a different model or a host with a different core count
+    (e.g. baked into an image shared by several node types) is ignored, so the
+    node falls back to defaults or re-tunes.
+
+    Args:
+        path (str, optional): Path to the tuning file (default: ORT_TUNING_CONFIG
+            or DEFAULT_TUNING_CONFIG_PATH).
+        model_path (str, optional): The model about to be loaded (default: ONNX_MODEL_PATH
+            or DEFAULT_MODEL_PATH).
+
+    Returns:
+        dict: The stored parameters, or an empty dict if no usable file exists.
+    """
+    path = path or os.getenv("ORT_TUNING_CONFIG", DEFAULT_TUNING_CONFIG_PATH)
+    model_path = model_path or os.getenv("ONNX_MODEL_PATH", DEFAULT_MODEL_PATH)
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable tuning config {path}: {e}")
+        return {}
+
+    tuned_model = config.get("model_path")
+    if not tuned_model or os.path.realpath(tuned_model) != os.path.realpath(model_path):
+        logging.warning(f"Ignoring tuning config {path}: tuned for model {tuned_model}, not {model_path}.")
+        return {}
+    if config.get("cpu_count") != os.cpu_count():
+        logging.warning(
+            f"Ignoring tuning config {path}: tuned on {config.get('cpu_count')} cores, "
+            f"this host has {os.cpu_count()}."
+        )
+        return {}
+
+    logging.info(f"Loaded ONNX Runtime tuning config from {path}: {config.get('params')}")
+    return config.get("params", {})
+
 
 class OnnxTTSHandler:
-    def __init__(self, default_voice=None):
+    def __init__(self, default_voice=None, model_path=None, intra_op_threads=None,
+                 inter_op_threads=None, session_count=None):
         logging.info("Initializing ONNX TTSHandler.")
         self.default_voice = default_voice or os.getenv("DEFAULT_VOICE", "af_bella")
         self.valid_voices = ["af_bella", "af_sky"]
-        model_path = os.getenv("ONNX_MODEL_PATH", "models/kokoro/kokoro.onnx")
+        self.sample_rate = SAMPLE_RATE
+        model_path = model_path or os.getenv("ONNX_MODEL_PATH", DEFAULT_MODEL_PATH)
 
         if not os.path.isfile(model_path):
             logging.error(f"ONNX model file not found: {model_path}")
             raise FileNotFoundError(f"ONNX model file not found at {model_path}")
 
+        # Explicit arguments win over environment variables, which win over the tuned config
+        tuned = load_tuning_config(model_path=model_path)
+        self.intra_op_threads = int(
+            intra_op_threads or os.getenv("ORT_INTRA_OP_THREADS") or tuned.get("intra_op_threads", 0)
+        )
+        self.inter_op_threads = int(
+            inter_op_threads or os.getenv("ORT_INTER_OP_THREADS") or tuned.get("inter_op_threads", 0)
+        )
+        self.session_count = max(1, int(
+            session_count or os.getenv("ORT_SESSION_COUNT") or tuned.get("session_count", 1)
+        ))
+
         try:
-            self.session = ort.InferenceSession(model_path)
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = self.intra_op_threads
+            options.inter_op_num_threads = self.inter_op_threads
+
+            # Each session serves one request at a time; concurrent requests check out separate sessions
+            self._sessions = queue.Queue()
+            for _ in range(self.session_count):
+                self._sessions.put(ort.InferenceSession(model_path, sess_options=options))
+
+            self.session = self._sessions.queue[0]
             self.input_name = self.session.get_inputs()[0].name
             self.output_name = self.session.get_outputs()[0].name
             self.required_inputs = [input.name for input in self.session.get_inputs()]
-            logging.info(f"ONNX model successfully loaded from {model_path}.")
+            logging.info(
+                f"ONNX model successfully loaded from {model_path} "
+                f"({self.session_count} session(s), intra_op_threads={self.intra_op_threads}, "
+                f"inter_op_threads={self.inter_op_threads})."
+            )
         except Exception as e:
             logging.error(f"Failed to initialize ONNX Runtime session: {e}")
             raise RuntimeError("ONNX Runtime initialization failed.") from e
 
+    def get_voices(self):
+        return self.valid_voices
+
     def generate_speech(self, text, voice=None, response_format="wav", speed=1.0):
+        audio = self.synthesize(text, voice=voice, speed=speed)
+
+        try:
+            # Define output directory based on module location
+            module_dir = os.path.dirname(os.path.abspath(__file__))
+            output_dir = os.path.join(module_dir, "outputs")
+            os.makedirs(output_dir, exist_ok=True)
+
+            # Save the audio file
+            output_file = os.path.join(output_dir, f"output.{response_format}")
+            sf.write(output_file, audio, samplerate=SAMPLE_RATE, format=response_format.upper())
+            logging.info(f"Generated audio saved to {output_file}")
+
+            return output_file
+        except Exception as e:
+            logging.error(f"Error during ONNX speech generation: {e}")
+            raise RuntimeError("Failed to generate speech with ONNX Runtime.") from e
+
+    def synthesize(self, text, voice=None, speed=1.0):
+        """
+        Run inference and return the raw audio samples in memory.
+
+        Args:
+            text (str): The input text to convert to speech.
+            voice (str, optional): The voice to use (default: the handler's default voice).
+            speed (float, optional): Speaking rate multiplier (default: 1.0).
+
+        Returns:
+            np.ndarray: One-dimensional float32 samples at SAMPLE_RATE.
+        """
         if not text:
             raise ValueError("Input text cannot be empty.")
 
@@ -45,19 +154,12 @@ class OnnxTTSHandler:
                 for name in self.required_inputs
             }
 
-            audio = self.session.run([self.output_name], inputs)[0]
-
-            # Define output directory based on module location
-            module_dir = os.path.dirname(os.path.abspath(__file__))
-            output_dir = os.path.join(module_dir, "outputs")
-            os.makedirs(output_dir, exist_ok=True)
-
-            # Save the audio file
-            output_file = os.path.join(output_dir, f"output.{response_format}")
-            sf.write(output_file, audio, samplerate=16000, format=response_format.upper())
-            logging.info(f"Generated audio saved to {output_file}")
-
-            return output_file
+            session = self._sessions.get()
+            try:
+                audio = session.run([self.output_name], inputs)[0]
+            finally:
+                self._sessions.put(session)
+            return np.asarray(audio, dtype=np.float32).reshape(-1)
         except Exception as e:
             logging.error(f"Error during ONNX speech generation: {e}")
             raise RuntimeError("Failed to generate speech with ONNX Runtime.") from e
@@ -0,0 +1,258 @@
+import os
+import bisect
+import hashlib
+import logging
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+from flask import Flask, Response, request, jsonify
+from openai_kokoro_tts.segment_cache import normalize_sentence
+
+# Headers that apply to a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host",
+}
+STREAM_CHUNK_BYTES = 16 * 1024
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring with virtual nodes.
+
+    Adding or removing a node only remaps the keys that node owns (or takes
+    over), so backend caches stay warm when the cluster changes.
+    """
+
+    def __init__(self, nodes=(), vnodes=100):
+        self.vnodes = vnodes
+        self._hashes = []
+        self._owners = {}
+        self.nodes = set()
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.vnodes):
+            point = _hash(f"{node}#{i}")
+            self._owners[point] = node
+            bisect.insort(self._hashes, point)
+
+    def remove(self, node):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        for i in range(self.vnodes):
+            point = _hash(f"{node}#{i}")
+            if self._owners.get(point) == node:
+                del self._owners[point]
+                self._hashes.pop(bisect.bisect_left(self._hashes, point))
+
+    def get_nodes(self, key):
+        """
+        List distinct nodes in ring order starting from the key's owner.
+
+        Args:
+            key (str): Routing key.
+
+        Returns:
+            list[str]: The owner first, followed by failover candidates.
+        """
+        if not self._hashes:
+            return []
+        start = bisect.bisect(self._hashes, _hash(key))
+        nodes = []
+        for offset in range(len(self._hashes)):
+            node = self._owners[self._hashes[(start + offset) % len(self._hashes)]]
+            if node not in nodes:
+                nodes.append(node)
+                if len(nodes) == len(self.nodes):
+                    break
+        return nodes
+
+
+class Router:
+    """
+    Tracks backend health and picks backends by cache affinity.
+
+    Only backends passing the readiness probe are placed on the hash ring;
+    a background thread re-probes them every ``health_interval`` seconds.
+    """
+
+    def __init__(self, backends, health_path="/health/ready", health_interval=5.0, timeout=60.0,
+                 default_voice=None):
+        self.backends = [backend.rstrip("/") for backend in backends]
+        # Must match the backends' default so omitting the voice and naming it explicitly share a key
+        self.default_voice = default_voice or os.getenv("DEFAULT_VOICE", "af_bella")
+        self.health_path = health_path
+        self.health_interval = health_interval
+        self.timeout = timeout
+        self.ring = HashRing()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def routing_key(self, data):
+        """
+        Build the affinity key for a speech request from its voice and normalized text.
+
+        A missing or empty voice is keyed as the default voice, which the backends synthesize.
+        """
+        voice = data.get('voice') or self.default_voice
+        return f"{voice}\x00{normalize_sentence(str(data.get('input', '')))}"
+
+    def probe(self, backend):
+        parsed = urlsplit(backend)
+        connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=2)
+        try:
+            connection.request("GET", self.health_path)
+            return connection.getresponse().status == 200
+        except OSError:
+            return False
+        finally:
+            connection.close()
+
+    def check_health(self):
+        """Probe every backend once and update ring membership."""
+        for backend in self.backends:
+            self.set_healthy(backend, self.probe(backend))
+
+    def set_healthy(self, backend, healthy):
+        with self._lock:
+            if healthy and backend not in self.ring.nodes:
+                logging.info(f"Backend {backend} is ready; adding to ring.")
+                self.ring.add(backend)
+            elif not healthy and backend in self.ring.nodes:
+                logging.warning(f"Backend {backend} failed readiness; removing from ring.")
+                self.ring.remove(backend)
+
+    def candidates(self, key):
+        with self._lock:
+            return self.ring.get_nodes(key)
+
+    def healthy_nodes(self):
+        """Snapshot the backends currently on the ring."""
+        with self._lock:
+            return sorted(self.ring.nodes)
+
+    def start(self):
+        """Run an initial health check, then keep checking in the background."""
+        self.check_health()
+
+        def loop():
+            while not self._stop.wait(self.health_interval):
+                self.check_health()
+
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def forward(self, backend, method, path, body, headers):
+        """
+        Send a request to a backend and stream its response back unbuffered.
+
+        Raises:
+            OSError: If the backend cannot be reached.
+        """
+        parsed = urlsplit(backend)
+        connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=self.timeout)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            upstream = connection.getresponse()
+        except OSError:
+            connection.close()
+            raise
+
+        def generate():
+            try:
+                while chunk := upstream.read1(STREAM_CHUNK_BYTES):
+                    yield chunk
+            finally:
+                connection.close()
+
+        response_headers = [
+            (name, value) for name, value in upstream.getheaders()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        ]
+        response_headers.append(("X-Backend", backend))
+        return Response(generate(), status=upstream.status, headers=response_headers)
+
+
+def create_app(router):
+    """
+    Build the router's Flask app.
+
+    Speech requests are routed by (voice, normalized text) so repeats land on
+    the replica whose caches already hold them; other requests are routed by
+    path. Unreachable backends are taken off the ring and the next candidate
+    is tried.
+    """
+    app = Flask(__name__)
+
+    @app.route('/health/ready', methods=['GET'])
+    def ready():
+        nodes = router.healthy_nodes()
+        status = 200 if nodes else 503
+        return jsonify({"status": "ready" if nodes else "unavailable", "backends": nodes}), status
+
+    @app.route('/<path:path>', methods=['GET', 'POST'])
+    def proxy(path):
+        body = request.get_data()
+        if request.path == '/v1/audio/speech':
+            key = router.routing_key(request.get_json(silent=True) or {})
+        else:
+            key = request.path
+
+        headers = {
+            name: value for name, value in request.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        }
+        target = request.full_path if request.query_string else request.path
+
+        for backend in router.candidates(key):
+            try:
+                return router.forward(backend, request.method, target, body, headers)
+            except OSError as e:
+                logging.error(f"Backend {backend} unreachable: {e}")
+                router.set_healthy(backend, False)
+
+        return jsonify({"error": "No healthy backends available"}), 503
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache-affinity router for multiple Kokoro TTS servers.")
+    parser.add_argument("--backends", type=str, default=os.getenv("ROUTER_BACKENDS", ""),
+                        help="Comma-separated backend URLs, e.g. http://127.0.0.1:9091,http://127.0.0.1:9092 "
+                             "(default: $ROUTER_BACKENDS).")
+    parser.add_argument("--port", type=int, default=int(os.getenv("ROUTER_PORT", 9090)),
+                        help="Port to listen on (default: $ROUTER_PORT or 9090).")
+    parser.add_argument("--health_interval", type=float, default=float(os.getenv("ROUTER_HEALTH_INTERVAL", 5.0)),
+                        help="Seconds between readiness probes (default: 5).")
+    args = parser.parse_args()
+
+    backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+    if not backends:
+        parser.error("At least one backend is required (--backends or ROUTER_BACKENDS).")
+
+    logging.basicConfig(level=logging.INFO)
+    router = Router(backends, health_interval=args.health_interval)
+    router.start()
+
+    logging.info(f"Kokoro-TTS router running on http://localhost:{args.port} for {backends}")
+    create_app(router).run(host='0.0.0.0', port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
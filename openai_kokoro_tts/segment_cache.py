@@ -0,0 +1,251 @@
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Split after sentence-ending punctuation (optionally followed by closing quotes/brackets)
+# or on blank lines, so each cached segment is one spoken sentence.
+SENTENCE_BOUNDARY = re.compile(r'(?:(?<=[.!?…])|(?<=[.!?…]["\')\]]))\s+|\n\s*\n')
+
+
+def normalize_sentence(sentence):
+    """
+    Normalize a sentence for use as a cache key.
+
+    Whitespace is collapsed and trimmed; casing and punctuation are preserved
+    because they change prosody.
+
+    Args:
+        sentence (str): Raw sentence text.
+
+    Returns:
+        str: Normalized sentence.
+    """
+    return " ".join(sentence.split())
+
+
+def split_sentences(text, max_chars=None):
+    """
+    Split input text into normalized, non-empty sentences.
+
+    Args:
+        text (str): The input text.
+        max_chars (int, optional): If set, sentences longer than this are
+            further split at whitespace so no segment exceeds it.
+
+    Returns:
+        list[str]: Sentences in their original order.
+    """
+    sentences = (normalize_sentence(part) for part in SENTENCE_BOUNDARY.split(text))
+    sentences = [sentence for sentence in sentences if sentence]
+    if not max_chars:
+        return sentences
+
+    segments = []
+    for sentence in sentences:
+        while len(sentence) > max_chars:
+            split = sentence.rfind(" ", 0, max_chars + 1)
+            split = split if split > 0 else max_chars
+            segments.append(sentence[:split].strip())
+            sentence = sentence[split:].strip()
+        if sentence:
+            segments.append(sentence)
+    return segments
+
+
+class SegmentCache:
+    """
+    Thread-safe LRU cache of synthesized audio segments, bounded by total bytes.
+    """
+
+    def __init__(self, max_bytes=None):
+        """
+        Args:
+            max_bytes (int, optional): Upper bound on cached audio bytes
+                (default: SEGMENT_CACHE_MAX_BYTES or 64 MiB). Zero disables caching.
+        """
+        if max_bytes is None:
+            max_bytes = int(os.getenv("SEGMENT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def get(self, key):
+        """
+        Look up a segment, marking it most recently used.
+
+        Returns:
+            np.ndarray or None: The cached samples, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            audio, compute_seconds = entry
+            self.saved_seconds += compute_seconds
+            return audio
+
+    def put(self, key, audio, compute_seconds=0.0):
+        """
+        Store a segment, evicting least recently used entries to stay within max_bytes.
+
+        Args:
+            key (tuple): Cache key, typically (sentence, voice, speed).
+            audio (np.ndarray): Synthesized samples; stored read-only.
+            compute_seconds (float): Inference time this entry saves on each hit.
+        """
+        size = audio.nbytes
+        if size > self.max_bytes:
+            return
+
+        audio.setflags(write=False)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[0].nbytes
+            self._entries[key] = (audio, compute_seconds)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all cached segments (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """
+        Report cache occupancy and effectiveness.
+
+        Returns:
+            dict: Entry and byte counts, hits, misses, hit rate, evictions and
+                inference seconds saved by hits.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+
+class CachedSynthesizer:
+    """
+    Sentence-level caching front end for a TTS handler.
+
+    Input text is split into sentences; each (sentence, voice, speed) is looked
+    up in a SegmentCache and only the missing sentences are passed to the
+    handler's ``synthesize`` method. The segment buffers are then stitched into
+    a single audio array.
+    """
+
+    def __init__(self, tts_handler, cache=None):
+        self.tts_handler = tts_handler
+        self.cache = cache if cache is not None else SegmentCache()
+        self._stats_lock = threading.Lock()
+        self.segments_total = 0
+        self.segments_synthesized = 0
+        self.samples_total = 0
+        self.samples_from_cache = 0
+
+    def synthesize(self, text, voice=None, speed=1.0, tracker=None):
+        """
+        Synthesize text, reusing cached sentences where possible.
+
+        A single-sentence input is returned without stitching; the array may be
+        a read-only cache entry.
+
+        Args:
+            text (str): The input text to convert to speech.
+            voice (str, optional): The voice to use (default: the handler's default voice).
+            speed (float, optional): Speaking rate multiplier (default: 1.0).
+            tracker (RequestMemoryTracker, optional): Records the segment buffers and the
+                stitched copy; the returned array is left for the caller to account for.
+
+        Returns:
+            np.ndarray: One-dimensional float32 samples.
+        """
+        sentences = split_sentences(text or "")
+        if not sentences:
+            raise ValueError("Input text cannot be empty.")
+
+        voice = voice or self.tts_handler.default_voice
+        segments = []
+        synthesized = 0
+        cached_samples = 0
+
+        for sentence in sentences:
+            key = (sentence, voice, float(speed))
+            audio = self.cache.get(key)
+            if audio is None:
+                start = time.perf_counter()
+                audio = self.tts_handler.synthesize(sentence, voice=voice, speed=speed)
+                self.cache.put(key, audio, time.perf_counter() - start)
+                synthesized += 1
+            else:
+                cached_samples += audio.size
+            segments.append(audio)
+            if tracker is not None:
+                tracker.allocate(audio.nbytes)
+
+        segment_count = len(segments)
+        stitched = segments[0] if segment_count == 1 else np.concatenate(segments)
+        if tracker is not None:
+            copied = stitched.nbytes if segment_count > 1 else 0
+            tracker.allocate(copied)
+            # The segment list is dropped on return and the caller accounts for the stitched array
+            tracker.release(sum(segment.nbytes for segment in segments) + copied)
+        del segments
+
+        logging.debug(
+            f"Stitched {segment_count} segments ({segment_count - synthesized} cached, "
+            f"{synthesized} synthesized) into {stitched.size} samples."
+        )
+
+        with self._stats_lock:
+            self.segments_total += segment_count
+            self.segments_synthesized += synthesized
+            self.samples_total += stitched.size
+            self.samples_from_cache += cached_samples
+
+        return stitched
+
+    def stats(self):
+        """
+        Report cache statistics together with the share of audio served without inference.
+
+        Returns:
+            dict: SegmentCache.stats() plus segment and sample counters.
+        """
+        stats = self.cache.stats()
+        with self._stats_lock:
+            stats.update({
+                "segments_total": self.segments_total,
+                "segments_synthesized": self.segments_synthesized,
+                "samples_total": self.samples_total,
+                "samples_from_cache": self.samples_from_cache,
+                "compute_saved_ratio": (
+                    self.samples_from_cache / self.samples_total if self.samples_total else 0.0
+                ),
+            })
+        return stats
@@ -5,13 +5,27 @@ import json
 import io
 import numpy as np
 import wave
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
+from flask_sock import Sock
 from functools import wraps
-from openai_kokoro_tts.onnx_tts_handler import OnnxTTSHandler
-from openai_kokoro_tts.utils import require_api_key, AUDIO_FORMAT_MIME_TYPES
+from openai_kokoro_tts.onnx_tts_handler import OnnxTTSHandler, SAMPLE_RATE, load_tuning_config
+from openai_kokoro_tts.tts_handler import TTSHandler
+from openai_kokoro_tts.autotune import autotune
+from openai_kokoro_tts.coalescing import SingleFlight
+from openai_kokoro_tts.memory_budget import (
+    MemoryBudget,
+    MemoryBudgetExceeded,
+    RequestMemoryTracker,
+    encode_wav_incrementally,
+    estimate_request_bytes,
+)
+from openai_kokoro_tts.segment_cache import CachedSynthesizer
+from openai_kokoro_tts.streaming import STREAMABLE_FORMATS, iter_speech_chunks, stream_speech
+from openai_kokoro_tts.utils import check_api_key, require_api_key, getenv_bool, parse_bool, parse_speed, AUDIO_FORMAT_MIME_TYPES
 
 # Initialize Flask app
 app = Flask(__name__)
+sock = Sock(app)
 DEBUG_MODE = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
 
 # Configure logging
@@ -21,20 +35,44 @@ if DEBUG_MODE:
 else:
     logging.basicConfig(level=logging.INFO)
 
-# Initialize ONNX TTS handler
-tts_handler = OnnxTTSHandler()
+# Select the synthesis backend: "onnx" (OnnxTTSHandler) or "kokoro_onnx" (TTSHandler)
+TTS_BACKEND = os.getenv('TTS_BACKEND', 'onnx').lower()
 
-def process_audio_output(audio, sample_rate=16000):
+if TTS_BACKEND == 'kokoro_onnx':
+    tts_handler = TTSHandler()
+else:
+    # Benchmark ONNX Runtime settings when auto-tuning is enabled and no tuning file matches this model and host
+    if getenv_bool("ORT_AUTOTUNE") and not load_tuning_config():
+        autotune()
+
+    # Initialize ONNX TTS handler
+    tts_handler = OnnxTTSHandler()
+logging.info(f"Using '{TTS_BACKEND}' backend at {tts_handler.sample_rate} Hz.")
+
+# Sentence-level audio cache in front of the handler
+synthesizer = CachedSynthesizer(tts_handler)
+
+# Identical in-flight requests share one synthesis
+coalescer = SingleFlight()
+
+# Per-request and global memory budgets; over-budget inputs are processed segment by segment
+memory_budget = MemoryBudget()
+SEGMENT_MAX_CHARS = int(os.getenv('SEGMENT_MAX_CHARS', 400))
+
+def process_audio_output(audio, sample_rate=SAMPLE_RATE, tracker=None):
     """
     Processes the raw audio output from the ONNX model into a WAV file as bytes.
 
     Args:
         audio (np.ndarray): Raw audio output from the model.
         sample_rate (int): Sampling rate of the audio (default: 16000).
+        tracker (RequestMemoryTracker, optional): Records the buffers held during encoding.
 
     Returns:
         bytes: Byte representation of the WAV file.
     """
+    tracker = tracker or RequestMemoryTracker()
+
     # Convert to numpy array if necessary
     if not isinstance(audio, np.ndarray):
         audio = np.array(audio)
@@ -49,19 +87,27 @@ def process_audio_output(audio, sample_rate=16000):
     # Ensure audio is floating-point and clip to the PCM range
     if audio.dtype.kind != 'f':
         audio = audio.astype(np.float32)
+    tracker.allocate(audio.nbytes)
 
-    audio = np.clip(audio * 32767, -32768, 32767).astype(np.int16)
+    # Scale and clip in place on a single temporary, then release it once converted
+    scaled = audio * 32767
+    tracker.allocate(scaled.nbytes)
+    np.clip(scaled, -32768, 32767, out=scaled)
+    pcm = scaled.astype(np.int16)
+    tracker.allocate(pcm.nbytes)
+    tracker.release(scaled.nbytes)
+    del scaled
 
-    # Write WAV file to an in-memory bytes buffer
+    # Write WAV file to an in-memory bytes buffer without an intermediate bytes copy of the PCM
     buffer = io.BytesIO()
     with wave.open(buffer, 'wb') as wav_file:
         wav_file.setnchannels(1)  # Mono
         wav_file.setsampwidth(2)  # 16-bit PCM
         wav_file.setframerate(sample_rate)
-        wav_file.writeframes(audio.tobytes())
+        wav_file.writeframes(pcm)
+    tracker.allocate(buffer.tell() * 2)  # The buffer and the returned copy
 
-    buffer.seek(0)
-    return buffer.read()
+    return buffer.getvalue()
 
 @app.route('/v1/audio/speech', methods=['POST'])
 @require_api_key
@@ -74,11 +120,20 @@ def text_to_speech():
         "input": "Text to convert to speech",
         "voice": "af_bella",  # Optional
         "response_format": "wav",  # Optional
-        "speed": 1.0  # Optional
+        "speed": 1.0,  # Optional
+        "model": "kokoro",  # Optional
+        "stream": false  # Optional, "pcm" and "wav" only
     }
 
+    Concurrent identical requests are coalesced onto one synthesis; streaming
+    requests that join late receive the audio produced so far, then follow live.
+    Inputs whose estimated memory exceeds the per-request budget are synthesized
+    and encoded segment by segment instead, without coalescing.
+
     Returns:
-        Audio file in the requested format.
+        Audio file in the requested format, or a chunked audio stream. Buffered
+        responses carry the request's memory high-water mark in X-Memory-Peak-Bytes;
+        streamed responses log it once the stream ends.
     """
     data = request.json
 
@@ -86,25 +141,112 @@ def text_to_speech():
         return jsonify({"error": "Missing 'input' in request body"}), 400
 
     text = data['input']
+    if not isinstance(text, str):
+        return jsonify({"error": "'input' must be a string"}), 400
     voice = data.get('voice', tts_handler.default_voice)
+    if not isinstance(voice, str):
+        return jsonify({"error": "'voice' must be a string"}), 400
     response_format = data.get('response_format', 'wav')
-    speed = float(data.get('speed', 1.0))
+    try:
+        speed = parse_speed(data.get('speed', 1.0))
+    except ValueError:
+        return jsonify({"error": "Invalid 'speed' value"}), 400
+    model = data.get('model')
+    if model is not None and not isinstance(model, str):
+        return jsonify({"error": "'model' must be a string"}), 400
+    try:
+        stream = parse_bool(data.get('stream', False))
+    except ValueError:
+        return jsonify({"error": "'stream' must be a boolean"}), 400
 
-    if response_format not in AUDIO_FORMAT_MIME_TYPES:
+    if not isinstance(response_format, str) or response_format not in AUDIO_FORMAT_MIME_TYPES:
         return jsonify({"error": f"Unsupported audio format: {response_format}"}), 400
+    if stream and response_format not in STREAMABLE_FORMATS:
+        return jsonify({"error": f"Streaming is not supported for format: {response_format}"}), 400
+
+    key = (text, voice, speed, model, response_format, stream)
+    mime_type = AUDIO_FORMAT_MIME_TYPES[response_format]
+    sample_rate = tts_handler.sample_rate
+
+    def log_peak(peak_bytes):
+        logging.info(
+            f"Request for {len(text)} chars used at most {peak_bytes} bytes of audio buffers "
+            f"({'incremental' if incremental else 'buffered'}{', streamed' if stream else ''})."
+        )
+
+    def make_chunks():
+        tracker = RequestMemoryTracker()
+        retained = 0
+        try:
+            for chunk in iter_speech_chunks(
+                synthesizer, text, voice, speed, response_format,
+                sample_rate=sample_rate, max_chars=SEGMENT_MAX_CHARS, tracker=tracker,
+            ):
+                if not incremental:
+                    # SingleFlight keeps every chunk for late joiners until the flight ends
+                    tracker.allocate(len(chunk))
+                    retained += len(chunk)
+                yield chunk
+        finally:
+            tracker.release(retained)
+            memory_budget.record(tracker, incremental=incremental)
+            log_peak(tracker.peak_bytes)
 
     try:
-        # Generate raw audio using the TTS handler
-        audio = tts_handler.generate_speech(text=text, voice=voice, speed=speed)
-        audio_bytes = process_audio_output(audio)
+        estimated_bytes = estimate_request_bytes(text, sample_rate, speed)
+        incremental = memory_budget.is_over_budget(estimated_bytes)
+
+        if stream:
+            if incremental:
+                # Too large to keep a replay buffer for late joiners, so stream without coalescing
+                chunks = memory_budget.reserved_iter(memory_budget.request_max_bytes, make_chunks)
+            else:
+                chunks = coalescer.stream(key, lambda: memory_budget.reserved_iter(estimated_bytes, make_chunks))
+            # Wait for the first chunk so validation and synthesis errors still map to status codes
+            first_chunk = next(chunks)
 
-        mime_type = AUDIO_FORMAT_MIME_TYPES[response_format]
-        return send_file(
-            io.BytesIO(audio_bytes),
+            def generate():
+                yield first_chunk
+                yield from chunks
+
+            return Response(generate(), mimetype=mime_type)
+
+        if incremental:
+            tracker = RequestMemoryTracker()
+            with memory_budget.reserve(memory_budget.request_max_bytes):
+                audio_file = encode_wav_incrementally(
+                    synthesizer, text, voice=voice, speed=speed, sample_rate=sample_rate,
+                    max_chars=SEGMENT_MAX_CHARS, spool_bytes=memory_budget.request_max_bytes // 2,
+                    tracker=tracker,
+                )
+            memory_budget.record(tracker, incremental=True)
+            peak_bytes = tracker.peak_bytes
+        else:
+            def synthesize_buffered():
+                # Runs once per coalesced flight, so every caller reports the synthesis's own peak
+                tracker = RequestMemoryTracker()
+                with memory_budget.reserve(estimated_bytes):
+                    # Generate raw audio using the TTS handler
+                    audio = synthesizer.synthesize(text, voice=voice, speed=speed, tracker=tracker)
+                    wav_bytes = process_audio_output(audio, sample_rate=sample_rate, tracker=tracker)
+                memory_budget.record(tracker)
+                return wav_bytes, tracker.peak_bytes
+
+            wav_bytes, peak_bytes = coalescer.do(key, synthesize_buffered)
+            audio_file = io.BytesIO(wav_bytes)
+        log_peak(peak_bytes)
+
+        response = send_file(
+            audio_file,
             mimetype=mime_type,
             as_attachment=True,
             download_name=f"speech.{response_format}"
         )
+        response.headers['X-Memory-Peak-Bytes'] = str(peak_bytes)
+        return response
+    except MemoryBudgetExceeded as e:
+        logging.warning(f"Rejected TTS request: {e}")
+        return jsonify({"error": str(e)}), 503
     except ValueError as e:
         logging.error(f"ValueError during TTS generation: {e}")
         return jsonify({"error": str(e)}), 400
@@ -115,6 +257,44 @@ def text_to_speech():
         logging.error(f"Unhandled exception during TTS generation: {e}")
         return jsonify({"error": "Failed to generate speech"}), 500
 
+@sock.route('/v1/audio/speech/stream')
+def text_to_speech_stream(ws):
+    """
+    Synthesize incrementally arriving text (e.g. LLM token deltas) over a WebSocket.
+
+    Query parameters:
+        voice: Initial voice (default: the handler's default voice).
+        speed: Initial speaking rate (default: 1.0).
+
+    Text deltas are buffered until a sentence or clause boundary, and each
+    completed span is synthesized and pushed back as PCM16 audio while more
+    text is still arriving. See streaming.stream_speech for the message protocol.
+
+    The WebSocket upgrade has already completed when this runs, so an
+    unauthorized client or invalid query parameter gets an error frame and a
+    close with code 1008 (policy violation) rather than an HTTP 4xx.
+    """
+    def reject(message):
+        ws.send(json.dumps({"type": "error", "error": message}))
+        ws.close(reason=1008, message=message)
+        # Let the client acknowledge the close before the socket is torn down; closing
+        # first can reset the connection and discard the error frame unread
+        ws.thread.join(timeout=1)
+
+    auth_error = check_api_key(request.headers.get('Authorization'))
+    if auth_error:
+        reject(auth_error)
+        return
+
+    voice = request.args.get('voice', tts_handler.default_voice)
+    try:
+        speed = parse_speed(request.args.get('speed', 1.0))
+    except ValueError:
+        reject("Invalid 'speed' value")
+        return
+
+    stream_speech(ws, synthesizer, voice=voice, speed=speed, sample_rate=tts_handler.sample_rate)
+
 @app.route('/v1/models', methods=['GET'])
 def list_models():
     """
@@ -128,6 +308,30 @@ def list_models():
         logging.debug(f"Available models: {models}")
     return jsonify({"models": models})
 
+@app.route('/v1/cache/stats', methods=['GET'])
+@require_api_key
+def cache_stats():
+    """
+    Report sentence-cache hit rates, compute savings, coalesced requests and memory budget usage.
+
+    Returns:
+        JSON response with cache statistics.
+    """
+    stats = synthesizer.stats()
+    stats.update(coalescer.stats())
+    stats.update(memory_budget.stats())
+    return jsonify(stats)
+
+@app.route('/health/ready', methods=['GET'])
+def readiness():
+    """
+    Readiness probe used by load balancers and the cache-affinity router.
+
+    Returns:
+        JSON status once the model is loaded and able to serve requests.
+    """
+    return jsonify({"status": "ready"})
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 9090))
     logging.info(f"Kokoro-TTS API running on http://localhost:{port}")
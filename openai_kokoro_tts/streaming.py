@@ -0,0 +1,257 @@
+import os
+import re
+import json
+import math
+import struct
+import logging
+import numpy as np
+from openai_kokoro_tts.onnx_tts_handler import SAMPLE_RATE
+from openai_kokoro_tts.segment_cache import split_sentences
+
+# Formats that can be emitted incrementally over HTTP
+STREAMABLE_FORMATS = ("pcm", "wav")
+
+# A span ends at sentence punctuation (plus closing quotes/brackets) or a clause
+# separator once followed by whitespace, or at a newline. Trailing punctuation
+# without whitespace is held back, since the next delta may continue it ("3." + "14").
+SPAN_BOUNDARY = re.compile(r'(?:([.!?…]["\')\]]*)|([,;:—]))\s+|\n')
+
+# Bytes per sample that to_pcm16 allocates on top of the float32 input:
+# the scaling temporary, the int16 PCM and the returned bytes.
+PCM16_ENCODE_BYTES_PER_SAMPLE = 4 + 2 + 2
+
+
+def to_pcm16(audio):
+    """
+    Convert float audio samples to little-endian 16-bit PCM bytes.
+
+    Args:
+        audio (np.ndarray): Float samples in the range [-1, 1].
+
+    Returns:
+        bytes: Raw PCM16 frames.
+    """
+    # Scale and clip in place on a single temporary
+    scaled = np.asarray(audio, dtype=np.float32) * 32767
+    np.clip(scaled, -32768, 32767, out=scaled)
+    return scaled.astype("<i2").tobytes()
+
+
+def wav_stream_header(sample_rate=SAMPLE_RATE):
+    """
+    Build a mono PCM16 WAV header for a stream of unknown length.
+
+    The RIFF and data chunk sizes are set to their maximum, which players
+    treat as "read until end of stream".
+
+    Args:
+        sample_rate (int): Sampling rate of the audio.
+
+    Returns:
+        bytes: The 44-byte WAV header.
+    """
+    unknown = 0xFFFFFFFF
+    return (
+        b"RIFF" + struct.pack("<I", unknown) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+        + b"data" + struct.pack("<I", unknown)
+    )
+
+
+def iter_speech_chunks(synthesizer, text, voice=None, speed=1.0, response_format="pcm",
+                       sample_rate=SAMPLE_RATE, max_chars=None, tracker=None):
+    """
+    Synthesize text sentence by sentence, yielding encoded audio as it is ready.
+
+    Args:
+        synthesizer: Object with a ``synthesize(text, voice, speed)`` method returning samples.
+        text (str): The input text.
+        voice (str, optional): The voice to use.
+        speed (float, optional): Speaking rate multiplier.
+        response_format (str, optional): One of STREAMABLE_FORMATS (default: "pcm").
+        sample_rate (int, optional): Sampling rate written to the WAV header.
+        max_chars (int, optional): Split sentences longer than this at whitespace.
+        tracker (RequestMemoryTracker, optional): Records each sentence's samples and
+            encoding buffers, and each chunk until the consumer asks for the next one.
+
+    Yields:
+        bytes: PCM16 audio per sentence; for "wav" the first chunk carries the header.
+    """
+    if response_format not in STREAMABLE_FORMATS:
+        raise ValueError(f"Streaming is not supported for format: {response_format}")
+
+    sentences = split_sentences(text or "", max_chars=max_chars)
+    if not sentences:
+        raise ValueError("Input text cannot be empty.")
+
+    header = wav_stream_header(sample_rate) if response_format == "wav" else b""
+    for sentence in sentences:
+        audio = synthesizer.synthesize(sentence, voice=voice, speed=speed)
+        working = audio.nbytes + audio.size * PCM16_ENCODE_BYTES_PER_SAMPLE
+        if tracker is not None:
+            tracker.allocate(working)
+        chunk = header + to_pcm16(audio)
+        del audio
+        if tracker is not None:
+            tracker.release(working - len(chunk))
+        # The header goes out with the first audio so synthesis errors surface before any bytes do
+        yield chunk
+        if tracker is not None:
+            tracker.release(len(chunk))
+        header = b""
+
+
+class TextDeltaBuffer:
+    """
+    Accumulates incremental text (e.g. LLM token deltas) and releases spans
+    that are ready to be synthesized.
+
+    Sentences are released as soon as they end. Clause boundaries (commas,
+    semicolons, colons, dashes) release a span only once it is at least
+    ``min_clause_chars`` long, so short fragments are not voiced in isolation.
+    Text with no boundary is force-split at whitespace once it exceeds
+    ``max_chars``.
+    """
+
+    def __init__(self, min_clause_chars=None, max_chars=None):
+        """
+        Args:
+            min_clause_chars (int, optional): Minimum span length for a clause
+                boundary to release it (default: STREAM_MIN_CLAUSE_CHARS or 40).
+            max_chars (int, optional): Span length that forces a split
+                (default: STREAM_MAX_CHARS or 300).
+        """
+        self.min_clause_chars = min_clause_chars or int(os.getenv("STREAM_MIN_CLAUSE_CHARS", 40))
+        self.max_chars = max_chars or int(os.getenv("STREAM_MAX_CHARS", 300))
+        self._text = ""
+
+    def feed(self, delta):
+        """
+        Append a text delta.
+
+        Args:
+            delta (str): Newly arrived text.
+
+        Returns:
+            list[str]: Completed spans, in order (possibly empty).
+        """
+        self._text += delta
+        spans = []
+        while True:
+            end = self._next_boundary()
+            if end is None:
+                break
+            span, self._text = self._text[:end].strip(), self._text[end:]
+            if span:
+                spans.append(span)
+        return spans
+
+    def flush(self):
+        """
+        Release whatever text is buffered, regardless of boundaries.
+
+        Returns:
+            list[str]: The remaining span, if any.
+        """
+        span, self._text = self._text.strip(), ""
+        return [span] if span else []
+
+    def _next_boundary(self):
+        for match in SPAN_BOUNDARY.finditer(self._text):
+            if match.group(2) and len(self._text[:match.start()].strip()) < self.min_clause_chars:
+                continue
+            return match.end()
+
+        if len(self._text) > self.max_chars:
+            split = self._text.rfind(" ", 0, self.max_chars)
+            return split + 1 if split > 0 else self.max_chars
+        return None
+
+
+def stream_speech(ws, synthesizer, voice=None, speed=1.0, sample_rate=SAMPLE_RATE):
+    """
+    Drive an incremental-text synthesis session over a WebSocket.
+
+    The client sends JSON text frames:
+        {"type": "text", "text": "<delta>"}  -- append text; completed spans are voiced
+        {"type": "config", "voice": "...", "speed": 1.0}  -- change voice/speed for later spans
+        {"type": "flush"}  -- voice any buffered text now
+        {"type": "close"}  -- flush, then end the session
+
+    For every voiced span the server sends a JSON frame
+    {"type": "audio", "text": span, "samples": n, "sample_rate": rate}
+    followed by a binary frame of mono PCM16 audio. "flushed" and "done"
+    frames acknowledge flush and close; failures are reported as
+    {"type": "error", "error": message} without ending the session.
+
+    Args:
+        ws: WebSocket exposing ``receive()`` and ``send()``.
+        synthesizer: Object with a ``synthesize(text, voice, speed)`` method returning samples.
+        voice (str, optional): Initial voice.
+        speed (float, optional): Initial speaking rate multiplier.
+        sample_rate (int, optional): Sample rate reported to the client.
+    """
+    buffer = TextDeltaBuffer()
+
+    def send_error(message):
+        ws.send(json.dumps({"type": "error", "error": message}))
+
+    def voice_spans(spans):
+        for span in spans:
+            try:
+                audio = synthesizer.synthesize(span, voice=voice, speed=speed)
+            except (ValueError, RuntimeError) as e:
+                logging.error(f"Error during streamed TTS generation: {e}")
+                send_error(str(e))
+                continue
+            ws.send(json.dumps({
+                "type": "audio",
+                "text": span,
+                "samples": int(audio.size),
+                "sample_rate": sample_rate,
+            }))
+            ws.send(to_pcm16(audio))
+
+    while True:
+        message = ws.receive()
+        if message is None:
+            break
+
+        try:
+            payload = json.loads(message)
+            if not isinstance(payload, dict):
+                raise ValueError("message must be a JSON object")
+        except ValueError as e:
+            send_error(f"Invalid message: {e}")
+            continue
+
+        kind = payload.get("type", "text")
+        if kind == "text":
+            text = payload.get("text", "")
+            if not isinstance(text, str):
+                send_error("Invalid 'text' value")
+                continue
+            voice_spans(buffer.feed(text))
+        elif kind == "config":
+            new_voice = payload.get("voice", voice)
+            if isinstance(new_voice, str):
+                voice = new_voice
+            else:
+                send_error("Invalid 'voice' value")
+            try:
+                new_speed = float(payload.get("speed", speed))
+            except (TypeError, ValueError):
+                new_speed = None
+            if new_speed is not None and math.isfinite(new_speed) and new_speed > 0:
+                speed = new_speed
+            else:
+                send_error("Invalid 'speed' value")
+        elif kind == "flush":
+            voice_spans(buffer.flush())
+            ws.send(json.dumps({"type": "flushed"}))
+        elif kind == "close":
+            voice_spans(buffer.flush())
+            ws.send(json.dumps({"type": "done"}))
+            break
+        else:
+            send_error(f"Unknown message type: {kind}")
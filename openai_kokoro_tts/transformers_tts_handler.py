@@ -1,14 +1,26 @@
 import os
+import queue
 import logging
+import threading
+from concurrent.futures import Future
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM
+from openai_kokoro_tts.utils import getenv_bool
+
+SAMPLE_RATE = 24000
 
 class TransformersTTSHandler:
     """
-    Text-to-Speech (TTS) Handler leveraging Hugging Face Transformers for GPU-accelerated inference.
+    Text-to-Speech (TTS) Handler leveraging Hugging Face Transformers.
+
+    This handler provides support for TTS model inference using pre-trained
+    language models, such as Kokoro-TTS, integrated with the Transformers library.
+    On CPU it runs under ``torch.inference_mode`` with a configurable thread
+    count and optional dynamic int8 quantization of linear layers. Concurrent
+    requests are grouped into padded batches by a background worker.
 
-    This handler provides support for high-performance TTS model inference using 
-    pre-trained language models, such as Kokoro-TTS, integrated with the Transformers library.
+    No phoneme-to-audio step is implemented yet, so synthesis raises instead of
+    returning audio and the server does not offer this backend.
     """
 
     def __init__(self):
@@ -16,39 +28,98 @@ class TransformersTTSHandler:
         Initializes the TransformersTTSHandler, loading the model and tokenizer.
         """
         logging.info("Initializing Transformers TTSHandler.")
-        
+
         # Load default voice setting from environment or fallback
         self.default_voice = os.getenv("DEFAULT_VOICE", "af_bella")
+        self.valid_voices = ["af_bella", "af_sky"]
+        self.sample_rate = SAMPLE_RATE
         logging.debug(f"Default voice set to: {self.default_voice}")
 
         # Set device for inference
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         logging.info(f"Using device: {self.device}")
 
+        # Configure CPU threading before any parallel work starts
+        num_threads = int(os.getenv("TORCH_NUM_THREADS", 0))
+        if num_threads > 0:
+            torch.set_num_threads(num_threads)
+        num_interop_threads = int(os.getenv("TORCH_NUM_INTEROP_THREADS", 0))
+        if num_interop_threads > 0:
+            try:
+                torch.set_num_interop_threads(num_interop_threads)
+            except RuntimeError as e:
+                logging.warning(f"Could not set inter-op threads (already initialized): {e}")
+        logging.info(f"Torch using {torch.get_num_threads()} intra-op thread(s).")
+
+        # Batching of concurrent requests
+        self.batch_max_size = max(1, int(os.getenv("TRANSFORMERS_BATCH_MAX_SIZE", 8)))
+        self.batch_max_wait = float(os.getenv("TRANSFORMERS_BATCH_MAX_WAIT_MS", 10)) / 1000
+
         # Resolve and validate model path or name
         model_name_or_path = os.getenv("TRANSFORMERS_MODEL_NAME", "kokoro/kokoro-transformers")
         logging.info(f"Loading Transformers model: {model_name_or_path}")
 
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name_or_path)
+            # Left padding keeps every prompt adjacent to its generated tokens in a batch
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name_or_path, padding_side="left")
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
+
             self.model = AutoModelForCausalLM.from_pretrained(model_name_or_path).to(self.device)
             self.model.eval()
+
+            if getenv_bool("TRANSFORMERS_QUANTIZE") and self.device.type == "cpu":
+                self.model = torch.ao.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                logging.info("Applied dynamic int8 quantization to linear layers.")
             logging.info(f"Transformers model '{model_name_or_path}' successfully loaded.")
         except Exception as e:
             logging.error(f"Failed to load Transformers model '{model_name_or_path}': {e}")
             raise RuntimeError("Model initialization failed.") from e
 
-    def generate_speech(self, text, voice=None, response_format="mp3"):
+        self._requests = queue.Queue()
+        self._worker = threading.Thread(target=self._batch_worker, daemon=True)
+        self._worker.start()
+
+    def get_voices(self):
+        """
+        Returns the list of available voices.
+
+        Returns:
+            list[str]: Voice names accepted by generate_speech.
+        """
+        return self.valid_voices
+
+    def generate_speech(self, text, voice=None, response_format=None, speed=1.0):
         """
         Generates speech audio from the provided text using the specified or default voice.
 
         Args:
             text (str): The input text to convert to speech.
             voice (str, optional): The voice model to use. Defaults to the configured default voice.
-            response_format (str, optional): The audio output format. Defaults to "mp3".
+            response_format (str, optional): Unused; encoding is left to the caller.
+            speed (float, optional): Speaking rate multiplier (default: 1.0).
+
+        Returns:
+            numpy.ndarray: One-dimensional float32 audio samples.
+        """
+        return self.synthesize(text, voice=voice, speed=speed)
+
+    def synthesize(self, text, voice=None, speed=1.0):
+        """
+        Queue text for batched inference and wait for its audio.
+
+        Args:
+            text (str): The input text to convert to speech.
+            voice (str, optional): The voice model to use. Defaults to the configured default voice.
+            speed (float, optional): Speaking rate multiplier (default: 1.0).
 
         Returns:
-            str: The path to the generated audio file.
+            numpy.ndarray: One-dimensional float32 audio samples.
+
+        Raises:
+            ValueError: If the text is empty or the voice is unknown.
         """
         if not text:
             logging.error("Input text is empty. Cannot proceed with TTS generation.")
@@ -56,47 +127,83 @@ class TransformersTTSHandler:
 
         # Select voice or fallback to default
         voice = voice or self.default_voice
+        if voice not in self.valid_voices:
+            raise ValueError(f"Invalid voice: {voice}. Valid options are: {self.valid_voices}")
         logging.debug(f"Using voice: {voice}")
 
+        future = Future()
+        self._requests.put((text, voice, speed, future))
         try:
-            # Tokenize input text
-            inputs = self.tokenizer(text, return_tensors="pt").to(self.device)
-            logging.debug(f"Input tokens: {inputs}")
+            return future.result()
+        except Exception as e:
+            logging.error(f"Error during Transformers speech generation: {e}")
+            raise RuntimeError("Failed to generate speech with Transformers.") from e
+
+    def _batch_worker(self):
+        """
+        Collect up to batch_max_size queued requests, waiting at most
+        batch_max_wait after the first, and run them as one batch.
+        """
+        while True:
+            batch = [self._requests.get()]
+            try:
+                while len(batch) < self.batch_max_size:
+                    batch.append(self._requests.get(timeout=self.batch_max_wait))
+            except queue.Empty:
+                pass
+
+            texts, voices, speeds, futures = zip(*batch)
+            try:
+                audios = self._generate_batch(list(texts), list(voices), list(speeds))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for future, audio in zip(futures, audios):
+                future.set_result(audio)
+
+    def _generate_batch(self, texts, voices, speeds):
+        """
+        Run padded batched generation for several texts.
 
-            # Perform inference
-            output = self.model.generate(**inputs)
-            logging.debug(f"Generated tokens: {output}")
+        Args:
+            texts (list[str]): Input texts.
+            voices (list[str]): Voice for each text.
+            speeds (list[float]): Speaking rate for each text.
 
-            # Decode output to phoneme-like structure
-            phonemes = self.tokenizer.decode(output[0], skip_special_tokens=True)
-            logging.debug(f"Decoded phonemes: {phonemes}")
+        Returns:
+            list[numpy.ndarray]: Audio for each text, in order.
+        """
+        # Tokenize input texts, padding to the longest
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True).to(self.device)
+        logging.debug(f"Batch of {len(texts)} input(s), padded length {inputs['input_ids'].shape[-1]}")
 
-            # Convert phonemes to audio (mock for demonstration)
-            audio = self._mock_text_to_audio(phonemes)
-            logging.debug(f"Generated audio shape: {audio.shape}")
+        # Perform inference
+        with torch.inference_mode():
+            output = self.model.generate(**inputs, pad_token_id=self.tokenizer.pad_token_id)
 
-            # Save audio to file
-            output_file = f"output.{response_format}"
-            with open(output_file, "wb") as f:
-                f.write(audio.astype("float32").tobytes())
-            logging.info(f"Generated audio saved to {output_file}")
+        # Decode output to phoneme-like structure
+        phonemes = self.tokenizer.batch_decode(output, skip_special_tokens=True)
+        logging.debug(f"Decoded phonemes: {phonemes}")
 
-            return output_file
-        except Exception as e:
-            logging.error(f"Error during Transformers speech generation: {e}")
-            raise RuntimeError("Failed to generate speech with Transformers.") from e
+        # Convert phonemes to audio
+        return [
+            self._phonemes_to_audio(p, voice, speed) for p, voice, speed in zip(phonemes, voices, speeds)
+        ]
 
-    def _mock_text_to_audio(self, phonemes):
+    def _phonemes_to_audio(self, phonemes, voice=None, speed=1.0):
         """
-        Mock function to convert phonemes to audio.
+        Render decoded phonemes as audio.
 
         Args:
-            phonemes (str): Decoded phonemes or text.
+            phonemes (str): Decoded phonemes.
+            voice (str, optional): Voice to render with.
+            speed (float): Speaking rate multiplier.
 
         Returns:
-            numpy.ndarray: Placeholder for audio data.
+            numpy.ndarray: One-dimensional float32 audio samples.
+
+        Raises:
+            NotImplementedError: Always; no vocoder is wired up for this backend yet.
         """
-        logging.debug("Converting phonemes to audio (mock implementation).")
-        import numpy as np
-        audio_length = len(phonemes) * 100  # Placeholder length
-        return np.random.rand(audio_length).astype("float32")
+        raise NotImplementedError("The Transformers backend has no phoneme-to-audio step yet.")
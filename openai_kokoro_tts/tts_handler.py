@@ -1,17 +1,33 @@
 import os
+import time
+import inspect
 import logging
+import threading
 import numpy as np
 from kokoro_onnx import Kokoro
+from openai_kokoro_tts.segment_cache import split_sentences
+
+# Output rate of the Kokoro-82M model
+SAMPLE_RATE = 24000
 
-DEBUG_MODE = os.getenv("DEBUG", "false").lower() in ("true", "1", "yes")
 
 class TTSHandler:
+    """
+    Text-to-Speech (TTS) Handler backed by the kokoro-onnx library.
+
+    A single loaded Kokoro instance is shared by all requests. Only
+    phonemization is serialized with a lock, since the espeak backend is not
+    safe to use from several threads at once; ONNX Runtime inference on the
+    resulting phonemes runs concurrently.
+    """
+
     def __init__(self):
         """
         Initialize TTSHandler with default voice and load the Kokoro ONNX model.
         """
         logging.info("Initializing TTSHandler.")
         self.default_voice = os.getenv("DEFAULT_VOICE", "af_bella")
+        self.lang = os.getenv("KOKORO_LANG", "en-us")
         model_path = os.getenv("MODEL_PATH", "models/kokoro/kokoro-v0_19.onnx")
         voices_path = os.getenv("VOICES_PATH", "models/kokoro/voices.json")
 
@@ -21,41 +37,117 @@ class TTSHandler:
             raise FileNotFoundError(f"Voices file not found at {voices_path}")
 
         # Initialize Kokoro-ONNX
-        self.kokoro = Kokoro(model_path, voices_path)
+        try:
+            self.kokoro = Kokoro(model_path, voices_path)
+        except Exception as e:
+            logging.error(f"Failed to load Kokoro model: {e}")
+            raise RuntimeError("Kokoro initialization failed.") from e
+
+        self._lock = threading.Lock()
+        # Newer kokoro-onnx releases take pre-computed phonemes via is_phonemes, older ones via phonemes=
+        self._takes_is_phonemes = "is_phonemes" in inspect.signature(self.kokoro.create).parameters
+        self.valid_voices = list(self.kokoro.get_voices()) if hasattr(self.kokoro, "get_voices") else []
+        self.sample_rate = SAMPLE_RATE
+        logging.info(f"Kokoro model successfully loaded from {model_path}.")
 
-    def generate_speech(self, text, voice=None, response_format="mp3"):
+    def get_voices(self):
+        """
+        List the voices available in the loaded voices file.
+
+        Returns:
+            list[str]: Voice names.
+        """
+        return self.valid_voices
+
+    def generate_speech(self, text, voice=None, response_format=None, speed=1.0):
         """
         Generate speech audio from the provided text using a specific voice.
 
         Args:
             text (str): The input text to convert to speech.
             voice (str, optional): The voice to use (default is set in the environment or "af_bella").
-            response_format (str, optional): The desired output format (default: "mp3").
+            response_format (str, optional): Unused; encoding is left to the caller.
+            speed (float, optional): Speaking rate multiplier (default: 1.0).
 
         Returns:
-            str: Path to the generated audio file.
+            tuple: (np.ndarray samples, int sample_rate, dict timings) where timings
+                holds phonemizer lock wait, phonemization, inference and audio
+                durations in seconds and the real-time factor.
         """
         if not text:
             raise ValueError("Input text cannot be empty.")
-        
-        voice = voice or self.default_voice
-        valid_formats = ['wav', 'mp3', 'ogg', 'flac']
-        if response_format.lower() not in valid_formats:
-            raise ValueError(f"Unsupported format: {response_format}")
 
+        voice = self._resolve_voice(voice)
         logging.debug(f"Generating audio with text: '{text}', voice: '{voice}'")
+        return self._create(text, voice, speed)
+
+    def synthesize(self, text, voice=None, speed=1.0):
+        """
+        Generate speech and return only the samples, matching OnnxTTSHandler.synthesize.
+
+        Returns:
+            np.ndarray: One-dimensional float32 samples at self.sample_rate.
+        """
+        samples, _, _ = self.generate_speech(text, voice=voice, speed=speed)
+        return samples
+
+    def stream_speech(self, text, voice=None, speed=1.0):
+        """
+        Generate speech sentence by sentence.
+
+        Each sentence is synthesized only when the consumer asks for it, so the
+        first audio is available after one sentence rather than the whole text.
+
+        Args:
+            text (str): The input text to convert to speech.
+            voice (str, optional): The voice to use.
+            speed (float, optional): Speaking rate multiplier (default: 1.0).
 
+        Yields:
+            tuple: (np.ndarray samples, int sample_rate, dict timings) per sentence.
+        """
+        sentences = split_sentences(text or "")
+        if not sentences:
+            raise ValueError("Input text cannot be empty.")
+
+        voice = self._resolve_voice(voice)
+        for sentence in sentences:
+            yield self._create(sentence, voice, speed)
+
+    def _resolve_voice(self, voice):
+        voice = voice or self.default_voice
+        if self.valid_voices and voice not in self.valid_voices:
+            raise ValueError(f"Invalid voice: {voice}. Valid options are: {self.valid_voices}")
+        return voice
+
+    def _create(self, text, voice, speed):
+        requested = time.perf_counter()
         try:
-            # Generate audio
-            audio = self._mock_text_to_audio() if DEBUG_MODE else self.kokoro.generate(text, voice)
-
-            # Save the audio to a file
-            output_file = f"output.{response_format}"
-            with open(output_file, "wb") as f:
-                f.write(audio)
-            
-            logging.info(f"Audio saved to {output_file}")
-            return output_file
+            with self._lock:
+                started = time.perf_counter()
+                phonemes = self.kokoro.tokenizer.phonemize(text, self.lang)
+            phonemized = time.perf_counter()
+            if self._takes_is_phonemes:
+                samples, sample_rate = self.kokoro.create(phonemes, voice, speed, self.lang, is_phonemes=True)
+            else:
+                samples, sample_rate = self.kokoro.create(text, voice, speed, self.lang, phonemes=phonemes)
+            finished = time.perf_counter()
         except Exception as e:
             logging.error(f"Error during TTS generation: {e}")
             raise RuntimeError("Failed to generate speech.") from e
+
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        audio_seconds = samples.size / sample_rate if sample_rate else 0.0
+        timings = {
+            "wait_seconds": started - requested,
+            "phonemize_seconds": phonemized - started,
+            "inference_seconds": finished - phonemized,
+            "audio_seconds": audio_seconds,
+            "real_time_factor": (finished - started) / audio_seconds if audio_seconds else 0.0,
+        }
+        logging.debug(
+            f"Synthesized {audio_seconds:.2f}s of audio in {timings['inference_seconds']:.3f}s "
+            f"after {timings['phonemize_seconds']:.3f}s phonemizing "
+            f"(waited {timings['wait_seconds']:.3f}s for the phonemizer)."
+        )
+        return samples, sample_rate, timings
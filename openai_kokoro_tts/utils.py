@@ -1,4 +1,5 @@
 import os
+import math
 import logging
 from flask import request, jsonify
 from functools import wraps
@@ -16,6 +17,54 @@ logging.basicConfig(level=LOG_LEVEL)
 if DEBUG_MODE:
     logging.debug("Debug mode enabled in utils.py.")
 
+TRUE_STRINGS = ("yes", "y", "true", "1", "t")
+FALSE_STRINGS = ("no", "n", "false", "0", "f", "")
+
+def parse_bool(value) -> bool:
+    """
+    Interpret a JSON or string flag as a boolean.
+
+    Args:
+        value: A bool, or a string such as "true"/"false" or "1"/"0".
+
+    Returns:
+        bool: The parsed flag.
+
+    Raises:
+        ValueError: If the value is not a recognizable boolean.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        if value.strip().lower() in TRUE_STRINGS:
+            return True
+        if value.strip().lower() in FALSE_STRINGS:
+            return False
+    raise ValueError(f"Invalid boolean value: {value!r}")
+
+def parse_speed(value) -> float:
+    """
+    Interpret a speaking-rate value.
+
+    Args:
+        value: A number or numeric string.
+
+    Returns:
+        float: The speed multiplier.
+
+    Raises:
+        ValueError: If the value is not a finite, positive number.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid speed value: {value!r}")
+    try:
+        speed = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid speed value: {value!r}") from None
+    if not math.isfinite(speed) or speed <= 0:
+        raise ValueError(f"Invalid speed value: {value!r}")
+    return speed
+
 def getenv_bool(name: str, default: bool = False) -> bool:
     """
     Get a boolean value from an environment variable.
@@ -27,7 +76,7 @@ def getenv_bool(name: str, default: bool = False) -> bool:
     Returns:
         bool: The boolean value of the environment variable.
     """
-    return os.getenv(name, str(default)).lower() in ("yes", "y", "true", "1", "t")
+    return os.getenv(name, str(default)).lower() in TRUE_STRINGS
 
 # Load API key and configuration for requiring API key
 API_KEY = os.getenv("API_KEY", "your_api_key_here")
@@ -36,6 +85,37 @@ REQUIRE_API_KEY = getenv_bool("REQUIRE_API_KEY", True)
 if not API_KEY or API_KEY == "your_api_key_here":
     raise ValueError("API_KEY must be set in the environment or .env file.")
 
+def check_api_key(auth_header):
+    """
+    Validate an Authorization header against the configured API key.
+
+    Args:
+        auth_header (str or None): The request's Authorization header.
+
+    Returns:
+        str or None: An error message if the request is not authorized, otherwise None.
+    """
+    # Skip authentication if API key requirement is disabled
+    if not REQUIRE_API_KEY:
+        return None
+
+    if not auth_header:
+        logging.warning("Authorization header is missing.")
+        return "Authorization header is missing"
+
+    if not auth_header.startswith("Bearer "):
+        logging.warning("Authorization header is malformed.")
+        return "Authorization header must start with 'Bearer'"
+
+    token = auth_header.split("Bearer ")[1]
+
+    # Validate the token against the stored API key
+    if token != API_KEY:
+        logging.warning("Invalid API key provided.")
+        return "Invalid API key"
+
+    return None
+
 def require_api_key(f):
     """
     Decorator to enforce API key authentication on routes.
@@ -48,25 +128,9 @@ def require_api_key(f):
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Skip authentication if API key requirement is disabled
-        if not REQUIRE_API_KEY:
-            return f(*args, **kwargs)
-
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            logging.warning("Authorization header is missing.")
-            return jsonify({"error": "Authorization header is missing"}), 401
-
-        if not auth_header.startswith("Bearer "):
-            logging.warning("Authorization header is malformed.")
-            return jsonify({"error": "Authorization header must start with 'Bearer'"}), 401
-
-        token = auth_header.split("Bearer ")[1]
-
-        # Validate the token against the stored API key
-        if token != API_KEY:
-            logging.warning("Invalid API key provided.")
-            return jsonify({"error": "Invalid API key"}), 401
+        error = check_api_key(request.headers.get("Authorization"))
+        if error:
+            return jsonify({"error": error}), 401
 
         return f(*args, **kwargs)
 
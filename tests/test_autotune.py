@@ -0,0 +1,94 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from openai_kokoro_tts.autotune import autotune, default_grid, select_best
+from openai_kokoro_tts.onnx_tts_handler import OnnxTTSHandler, load_tuning_config
+
+
+def make_result(threads, sessions, throughput, p95_latency):
+    return {
+        "intra_op_threads": threads,
+        "inter_op_threads": 1,
+        "session_count": sessions,
+        "throughput": throughput,
+        "p50_latency": p95_latency / 2,
+        "p95_latency": p95_latency,
+    }
+
+
+class TestAutotune(unittest.TestCase):
+    def test_default_grid_avoids_oversubscription(self):
+        """
+        Test that the default grid never uses more threads than cores.
+        """
+        grid = default_grid(cpu_count=6)
+        self.assertIn((6, 1), grid)
+        self.assertIn((2, 2), grid)
+        self.assertTrue(all(threads * sessions <= 6 for threads, sessions in grid))
+
+    def test_select_best_respects_slo(self):
+        """
+        Test that the fastest configuration within the SLO wins, with a fallback to lowest latency.
+        """
+        results = [
+            make_result(1, 4, throughput=9.0, p95_latency=3.0),
+            make_result(2, 2, throughput=7.0, p95_latency=1.0),
+            make_result(4, 1, throughput=5.0, p95_latency=0.5),
+        ]
+        self.assertEqual(select_best(results, latency_slo=1.5)["session_count"], 2)
+        self.assertEqual(select_best(results, latency_slo=0.1)["session_count"], 1)
+
+    @patch("openai_kokoro_tts.onnx_tts_handler.ort.InferenceSession")
+    @patch("openai_kokoro_tts.autotune.benchmark_config")
+    def test_tuned_config_loaded_by_handler(self, mock_benchmark, mock_inference_session):
+        """
+        Test that the persisted result is applied by OnnxTTSHandler on the next start.
+        """
+        mock_benchmark.side_effect = lambda model_path, threads, sessions, **kwargs: make_result(
+            threads, sessions, throughput=threads * sessions, p95_latency=0.1
+        )
+        mock_inference_session.return_value = MagicMock()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = os.path.join(tmp, "kokoro.onnx")
+            config_path = os.path.join(tmp, "ort_tuning.json")
+            open(model_path, "wb").close()
+
+            autotune(model_path, config_path, grid=[(1, 1), (2, 2), (4, 1)], latency_slo=1.0)
+            with open(config_path) as f:
+                self.assertEqual(json.load(f)["params"]["session_count"], 2)
+
+            with patch.dict(os.environ, {"ONNX_MODEL_PATH": model_path, "ORT_TUNING_CONFIG": config_path}):
+                handler = OnnxTTSHandler()
+
+        self.assertEqual(handler.intra_op_threads, 2)
+        self.assertEqual(handler.session_count, 2)
+        self.assertEqual(mock_inference_session.call_count, 2)
+
+    def test_tuning_config_for_other_model_or_host_ignored(self):
+        """
+        Test that a tuning file recorded for another model or core count is treated as missing.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = os.path.join(tmp, "kokoro.onnx")
+            config_path = os.path.join(tmp, "ort_tuning.json")
+            params = {"intra_op_threads": 2, "inter_op_threads": 1, "session_count": 2}
+
+            def write_config(tuned_model, cpu_count):
+                with open(config_path, "w") as f:
+                    json.dump({"params": params, "model_path": tuned_model, "cpu_count": cpu_count}, f)
+
+            write_config(model_path, os.cpu_count())
+            self.assertEqual(load_tuning_config(config_path, model_path=model_path), params)
+
+            write_config(os.path.join(tmp, "other.onnx"), os.cpu_count())
+            self.assertEqual(load_tuning_config(config_path, model_path=model_path), {})
+
+            write_config(model_path, (os.cpu_count() or 1) + 8)
+            self.assertEqual(load_tuning_config(config_path, model_path=model_path), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from openai_kokoro_tts.coalescing import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_computation(self):
+        """
+        Test that identical concurrent requests run the function once and all get its result.
+        """
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def synthesize():
+            calls.append(1)
+            release.wait(5)
+            return b"audio"
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(flights.do, "key", synthesize) for _ in range(4)]
+            while flights.stats()["requests_coalesced"] < 3:
+                threading.Event().wait(0.01)
+            release.set()
+            results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(results, [b"audio"] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flights.stats()["flights_in_progress"], 0)
+
+    def test_errors_propagate_to_followers(self):
+        """
+        Test that a failure is raised for every coalesced caller and the key is released.
+        """
+        flights = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise RuntimeError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(flights.do, "key", fail) for _ in range(2)]
+            while flights.stats()["requests_coalesced"] < 1:
+                threading.Event().wait(0.01)
+            release.set()
+            for future in futures:
+                with self.assertRaises(RuntimeError):
+                    future.result(timeout=5)
+
+        self.assertEqual(flights.do("key", lambda: "fresh"), "fresh")
+
+    def test_stream_subscriber_joins_mid_stream(self):
+        """
+        Test that a late stream subscriber replays earlier chunks, then follows live.
+        """
+        flights = SingleFlight()
+        first_sent = threading.Event()
+        release = threading.Event()
+
+        def produce():
+            yield b"one"
+            first_sent.set()
+            release.wait(5)
+            yield b"two"
+
+        leader = flights.stream("key", produce)
+        self.assertEqual(next(leader), b"one")
+        first_sent.wait(5)
+
+        follower = flights.stream("key", lambda: iter([b"unused"]))
+        self.assertEqual(next(follower), b"one")
+        release.set()
+
+        self.assertEqual(list(leader), [b"two"])
+        self.assertEqual(list(follower), [b"two"])
+        self.assertEqual(flights.stats()["flights_started"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
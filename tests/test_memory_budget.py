@@ -0,0 +1,100 @@
+import io
+import wave
+import threading
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+from openai_kokoro_tts.memory_budget import (
+    MemoryBudget,
+    MemoryBudgetExceeded,
+    RequestMemoryTracker,
+    encode_wav_incrementally,
+    estimate_request_bytes,
+)
+from openai_kokoro_tts.segment_cache import split_sentences
+from openai_kokoro_tts.streaming import PCM16_ENCODE_BYTES_PER_SAMPLE
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def test_estimate_scales_with_length_and_speed(self):
+        """
+        Test that longer or slower inputs are estimated to need more memory.
+        """
+        short = estimate_request_bytes("a" * 150, 16000)
+        self.assertGreater(estimate_request_bytes("a" * 1500, 16000), short)
+        self.assertGreater(estimate_request_bytes("a" * 150, 16000, speed=0.5), short)
+        self.assertTrue(MemoryBudget(max_bytes=10**9, request_max_bytes=short - 1).is_over_budget(short))
+
+    def test_reservation_waits_then_times_out(self):
+        """
+        Test that reservations beyond the global budget wait for releases and fail after the timeout.
+        """
+        budget = MemoryBudget(max_bytes=100, request_max_bytes=100, timeout=0.05)
+        with budget.reserve(80):
+            with self.assertRaises(MemoryBudgetExceeded):
+                with budget.reserve(30):
+                    pass
+        self.assertEqual(budget.stats()["memory_reserved_bytes"], 0)
+
+        budget.timeout = 5
+        released = threading.Event()
+
+        def hold():
+            with budget.reserve(80):
+                released.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        threading.Timer(0.05, released.set).start()
+        with budget.reserve(50):
+            self.assertTrue(released.is_set())
+        holder.join(5)
+        self.assertEqual(budget.stats()["memory_peak_reserved_bytes"], 80)
+
+    def test_oversized_reservation_capped(self):
+        """
+        Test that a reservation larger than the whole budget can still run alone.
+        """
+        budget = MemoryBudget(max_bytes=100, request_max_bytes=50, timeout=0.01)
+        with budget.reserve(500):
+            self.assertEqual(budget.stats()["memory_reserved_bytes"], 100)
+
+
+class TestIncrementalEncoding(unittest.TestCase):
+    def test_split_long_sentences(self):
+        """
+        Test that sentences longer than max_chars are split at whitespace.
+        """
+        self.assertEqual(
+            split_sentences("one two three four. Five.", max_chars=9),
+            ["one two", "three", "four.", "Five."],
+        )
+
+    def test_wav_matches_and_peak_is_per_segment(self):
+        """
+        Test that segment-by-segment encoding yields the full WAV while only one segment is held.
+        """
+        synthesizer = MagicMock()
+        synthesizer.synthesize.side_effect = (
+            lambda text, voice=None, speed=1.0: np.full(1000, 0.25, dtype=np.float32)
+        )
+        text = " ".join(f"Sentence {i}." for i in range(50))
+        tracker = RequestMemoryTracker()
+
+        output = encode_wav_incrementally(
+            synthesizer, text, sample_rate=16000, spool_bytes=10000, tracker=tracker
+        )
+
+        with wave.open(io.BytesIO(output.read())) as wav_file:
+            self.assertEqual(wav_file.getframerate(), 16000)
+            self.assertEqual(wav_file.getnframes(), 50 * 1000)
+            frames = np.frombuffer(wav_file.readframes(10), dtype=np.int16)
+        self.assertTrue(np.all(frames == int(0.25 * 32767)))
+        self.assertEqual(synthesizer.synthesize.call_count, 50)
+        # At most the in-memory spool plus one segment's samples and encoding buffers
+        self.assertLessEqual(tracker.peak_bytes, 10000 + 1000 * (4 + PCM16_ENCODE_BYTES_PER_SAMPLE))
+        self.assertEqual(tracker.current_bytes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import json
+import threading
+import unittest
+from flask import Flask, Response, request
+from werkzeug.serving import make_server
+from openai_kokoro_tts.router import HashRing, Router, create_app
+
+
+def start_backend(name, ready=True):
+    app = Flask(name)
+
+    @app.route('/health/ready')
+    def health():
+        return ("ok", 200) if ready else ("starting", 503)
+
+    @app.route('/v1/audio/speech', methods=['POST'])
+    def speech():
+        data = request.get_json()
+        return Response((chunk.encode() for chunk in [name, ":", data["input"]]), mimetype="audio/L16")
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+class TestHashRing(unittest.TestCase):
+    def test_minimal_remapping_on_join(self):
+        """
+        Test that adding a node only moves keys onto the new node.
+        """
+        ring = HashRing(["a", "b", "c"])
+        keys = [f"key-{i}" for i in range(2000)]
+        before = {key: ring.get_nodes(key)[0] for key in keys}
+
+        ring.add("d")
+        after = {key: ring.get_nodes(key)[0] for key in keys}
+
+        moved = [key for key in keys if before[key] != after[key]]
+        self.assertTrue(all(after[key] == "d" for key in moved))
+        self.assertLess(len(moved), len(keys) / 2)
+
+        ring.remove("d")
+        self.assertEqual({key: ring.get_nodes(key)[0] for key in keys}, before)
+
+    def test_failover_order(self):
+        """
+        Test that every node is listed once as a candidate.
+        """
+        ring = HashRing(["a", "b", "c"])
+        self.assertEqual(sorted(ring.get_nodes("x")), ["a", "b", "c"])
+        self.assertEqual(HashRing().get_nodes("x"), [])
+
+
+class TestRouter(unittest.TestCase):
+    def setUp(self):
+        self.servers = []
+        backends = []
+        for name, ready in (("one", True), ("two", True), ("down", False)):
+            server, url = start_backend(name, ready)
+            self.servers.append(server)
+            backends.append(url)
+        self.router = Router(backends)
+        self.router.check_health()
+        self.client = create_app(self.router).test_client()
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+
+    def post(self, text, voice="af_sky"):
+        data = {"input": text} if voice is None else {"input": text, "voice": voice}
+        return self.client.post("/v1/audio/speech", data=json.dumps(data), content_type="application/json")
+
+    def test_unready_backend_excluded(self):
+        """
+        Test that only backends passing the readiness probe join the ring.
+        """
+        self.assertEqual(len(self.router.healthy_nodes()), 2)
+        self.assertEqual(self.client.get("/health/ready").status_code, 200)
+
+    def test_same_text_routes_to_same_backend(self):
+        """
+        Test that requests differing only in whitespace land on the same backend.
+        """
+        first = self.post("Hello  world.")
+        second = self.post(" Hello world. ")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["X-Backend"], second.headers["X-Backend"])
+        self.assertTrue(first.data.endswith(b":Hello  world."))
+
+    def test_default_voice_routes_like_omitted_voice(self):
+        """
+        Test that omitting the voice and naming the default voice route to the same backend.
+        """
+        self.assertEqual(
+            self.router.routing_key({"input": "Hello."}),
+            self.router.routing_key({"input": "Hello.", "voice": self.router.default_voice}),
+        )
+        self.assertEqual(self.router.routing_key({"input": "Hello.", "voice": ""}),
+                         self.router.routing_key({"input": "Hello."}))
+        for i in range(5):
+            omitted = self.post(f"Default voice {i}.", voice=None)
+            explicit = self.post(f"Default voice {i}.", voice=self.router.default_voice)
+            self.assertEqual(omitted.headers["X-Backend"], explicit.headers["X-Backend"])
+
+    def test_failover_when_backend_unreachable(self):
+        """
+        Test that an unreachable backend is removed and the next candidate serves the request.
+        """
+        owner = self.post("Failover.").headers["X-Backend"]
+        server = self.servers[self.router.backends.index(owner)]
+        server.shutdown()
+        server.server_close()
+
+        response = self.post("Failover.")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["X-Backend"], owner)
+        self.assertNotIn(owner, self.router.healthy_nodes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+from openai_kokoro_tts.memory_budget import RequestMemoryTracker
+from openai_kokoro_tts.segment_cache import (
+    CachedSynthesizer,
+    SegmentCache,
+    split_sentences,
+)
+
+
+class TestSplitSentences(unittest.TestCase):
+    def test_split_and_normalize(self):
+        """
+        Test that text is split on sentence boundaries and whitespace is collapsed.
+        """
+        text = "Hello  there.  How are\nyou? \"Fine!\" Thanks\n\nBye"
+        self.assertEqual(
+            split_sentences(text),
+            ["Hello there.", "How are you?", "\"Fine!\"", "Thanks", "Bye"],
+        )
+
+    def test_empty_text(self):
+        """
+        Test that whitespace-only input yields no sentences.
+        """
+        self.assertEqual(split_sentences("   \n "), [])
+
+
+class TestSegmentCache(unittest.TestCase):
+    def test_lru_eviction_by_bytes(self):
+        """
+        Test that the least recently used segment is evicted when over budget.
+        """
+        cache = SegmentCache(max_bytes=3 * 400)
+        for name in ("a", "b", "c"):
+            cache.put(name, np.zeros(100, dtype=np.float32))
+        self.assertIsNotNone(cache.get("a"))
+
+        cache.put("d", np.zeros(100, dtype=np.float32))
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.stats()["bytes"], 1200)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_oversized_segment_not_cached(self):
+        """
+        Test that a segment larger than the whole budget is not stored.
+        """
+        cache = SegmentCache(max_bytes=100)
+        cache.put("big", np.zeros(100, dtype=np.float32))
+        self.assertIsNone(cache.get("big"))
+
+
+class TestCachedSynthesizer(unittest.TestCase):
+    def setUp(self):
+        self.handler = MagicMock()
+        self.handler.default_voice = "af_sky"
+        self.handler.synthesize.side_effect = (
+            lambda text, voice=None, speed=1.0: np.full(len(text), 0.1, dtype=np.float32)
+        )
+        self.synthesizer = CachedSynthesizer(self.handler, SegmentCache(max_bytes=1024 * 1024))
+
+    def test_only_missing_segments_synthesized(self):
+        """
+        Test that repeated sentences are served from the cache and stitched in order.
+        """
+        self.synthesizer.synthesize("Hello Alice. Your order shipped.")
+        self.handler.synthesize.reset_mock()
+
+        audio = self.synthesizer.synthesize("Hello Bob. Your order shipped.")
+
+        self.handler.synthesize.assert_called_once_with("Hello Bob.", voice="af_sky", speed=1.0)
+        self.assertEqual(audio.size, len("Hello Bob.") + len("Your order shipped."))
+
+        stats = self.synthesizer.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["segments_synthesized"], 3)
+        self.assertGreater(stats["compute_saved_ratio"], 0.0)
+
+    def test_tracker_counts_segments_and_stitched_copy(self):
+        """
+        Test that the segment buffers and their stitched copy are tracked, and released on return.
+        """
+        tracker = RequestMemoryTracker()
+        audio = self.synthesizer.synthesize("Hello Alice. Your order shipped.", tracker=tracker)
+        self.assertEqual(tracker.peak_bytes, audio.nbytes * 2)
+        self.assertEqual(tracker.current_bytes, 0)
+
+        # A single sentence is returned as is, without a stitched copy
+        tracker = RequestMemoryTracker()
+        audio = self.synthesizer.synthesize("Hello Alice.", tracker=tracker)
+        self.assertEqual(tracker.peak_bytes, audio.nbytes)
+        self.assertEqual(tracker.current_bytes, 0)
+
+    def test_voice_and_speed_are_part_of_key(self):
+        """
+        Test that the same sentence with a different voice or speed is synthesized again.
+        """
+        self.synthesizer.synthesize("Hi.", voice="af_sky")
+        self.synthesizer.synthesize("Hi.", voice="af_bella")
+        self.synthesizer.synthesize("Hi.", voice="af_sky", speed=1.5)
+        self.assertEqual(self.handler.synthesize.call_count, 3)
+
+    def test_empty_text(self):
+        """
+        Test that a ValueError is raised for empty input text.
+        """
+        with self.assertRaises(ValueError):
+            self.synthesizer.synthesize("  ")
+
+
+if __name__ == "__main__":
+    unittest.main()
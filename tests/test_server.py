@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+import simple_websocket
+from werkzeug.serving import make_server
+
+API_KEY = "test-api-key"
+
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Import the server against a mocked ONNX session and serve it on a free port.
+        """
+        cls.tmp = tempfile.TemporaryDirectory()
+        model_path = os.path.join(cls.tmp.name, "kokoro.onnx")
+        open(model_path, "wb").close()
+
+        session = MagicMock()
+        session.run.side_effect = lambda outputs, inputs: [
+            np.full(inputs["tokens"].shape[1] * 10, 0.5, dtype=np.float32)
+        ]
+        tokens_input = MagicMock()
+        tokens_input.name = "tokens"
+        session.get_inputs.return_value = [tokens_input]
+
+        env = {
+            "API_KEY": API_KEY,
+            "REQUIRE_API_KEY": "true",
+            "ONNX_MODEL_PATH": model_path,
+            "ORT_TUNING_CONFIG": os.path.join(cls.tmp.name, "ort_tuning.json"),
+        }
+        with patch.dict(os.environ, env), \
+                patch("openai_kokoro_tts.onnx_tts_handler.ort.InferenceSession", return_value=session):
+            from openai_kokoro_tts import server
+        cls.server = server
+        cls.client = server.app.test_client()
+        cls.headers = {"Authorization": f"Bearer {API_KEY}"}
+
+        cls.http = make_server("127.0.0.1", 0, server.app, threaded=True)
+        threading.Thread(target=cls.http.serve_forever, daemon=True).start()
+        cls.ws_url = f"ws://127.0.0.1:{cls.http.server_port}/v1/audio/speech/stream"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.http.shutdown()
+        cls.tmp.cleanup()
+
+    def wait_for(self, predicate, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            self.assertLess(time.monotonic(), deadline, "Timed out waiting for condition")
+            time.sleep(0.01)
+
+    def test_stream_flag_parsed_as_boolean(self):
+        """
+        Test that a "false" string disables streaming and unparseable flags are rejected.
+        """
+        response = self.client.post("/v1/audio/speech", headers=self.headers, json={
+            "input": "Hello there.", "response_format": "mp3", "stream": "false",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "audio/mpeg")
+
+        response = self.client.post("/v1/audio/speech", headers=self.headers, json={
+            "input": "Hello there.", "response_format": "mp3", "stream": "true",
+        })
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post("/v1/audio/speech", headers=self.headers, json={
+            "input": "Hello there.", "stream": "maybe",
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_fields_rejected(self):
+        """
+        Test that malformed fields are a JSON 400 rather than an unhandled error.
+        """
+        payloads = (
+            {"input": 123},
+            {"input": ["Hello."]},
+            {"input": "Hello.", "voice": ["af_bella"]},
+            {"input": "Hello.", "model": {"name": "kokoro"}},
+            {"input": "Hello.", "response_format": ["wav"]},
+            {"input": "Hello.", "speed": "fast"},
+            {"input": "Hello.", "speed": 0},
+            {"input": "Hello.", "speed": -1},
+            {"input": "Hello.", "speed": "inf"},
+        )
+        for payload in payloads:
+            response = self.client.post("/v1/audio/speech", headers=self.headers, json=payload)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.get_json())
+
+    def test_coalesced_requests_share_peak(self):
+        """
+        Test that a request coalesced onto another synthesis reports that synthesis's memory peak.
+        """
+        handler = self.server.tts_handler
+        release = threading.Event()
+        synthesize = handler.synthesize
+
+        def gated(*args, **kwargs):
+            release.wait(5)
+            return synthesize(*args, **kwargs)
+
+        payload = {"input": "Peak sharing check. Two sentences.", "response_format": "wav"}
+        responses = []
+
+        def post():
+            responses.append(self.client.post("/v1/audio/speech", headers=self.headers, json=payload))
+
+        stats = self.server.coalescer.stats
+        coalesced = stats()["requests_coalesced"]
+        with patch.object(handler, "synthesize", side_effect=gated):
+            leader = threading.Thread(target=post)
+            follower = threading.Thread(target=post)
+            leader.start()
+            self.wait_for(lambda: stats()["flights_in_progress"])
+            follower.start()
+            self.wait_for(lambda: stats()["requests_coalesced"] > coalesced)
+            release.set()
+            leader.join(5)
+            follower.join(5)
+
+        peaks = [int(response.headers["X-Memory-Peak-Bytes"]) for response in responses]
+        self.assertEqual(len(peaks), 2)
+        self.assertGreater(peaks[0], 0)
+        self.assertEqual(peaks[0], peaks[1])
+
+    def test_websocket_unauthorized(self):
+        """
+        Test that a WebSocket client without a valid key gets an error frame and a 1008 close.
+        """
+        ws = simple_websocket.Client.connect(self.ws_url)
+        try:
+            event = json.loads(ws.receive(timeout=5))
+            self.assertEqual(event["type"], "error")
+            self.assertEqual(event["error"], "Authorization header is missing")
+            with self.assertRaises(simple_websocket.ConnectionClosed) as closed:
+                ws.receive(timeout=5)
+            self.assertEqual(closed.exception.reason, 1008)
+        finally:
+            if ws.connected:
+                ws.close()
+
+    def test_websocket_invalid_speed(self):
+        """
+        Test that an invalid speed query parameter gets an error frame and a 1008 close.
+        """
+        ws = simple_websocket.Client.connect(self.ws_url + "?speed=fast", headers=self.headers)
+        try:
+            event = json.loads(ws.receive(timeout=5))
+            self.assertEqual(event, {"type": "error", "error": "Invalid 'speed' value"})
+            with self.assertRaises(simple_websocket.ConnectionClosed) as closed:
+                ws.receive(timeout=5)
+            self.assertEqual(closed.exception.reason, 1008)
+        finally:
+            if ws.connected:
+                ws.close()
+
+    def test_websocket_authorized(self):
+        """
+        Test that an authorized WebSocket client receives audio for its text.
+        """
+        ws = simple_websocket.Client.connect(self.ws_url, headers=self.headers)
+        try:
+            ws.send(json.dumps({"type": "text", "text": "Hello there."}))
+            ws.send(json.dumps({"type": "close"}))
+            event = json.loads(ws.receive(timeout=5))
+            self.assertEqual(event["type"], "audio")
+            self.assertEqual(len(ws.receive(timeout=5)), event["samples"] * 2)
+        finally:
+            if ws.connected:
+                ws.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+from openai_kokoro_tts.memory_budget import RequestMemoryTracker
+from openai_kokoro_tts.streaming import (
+    PCM16_ENCODE_BYTES_PER_SAMPLE,
+    TextDeltaBuffer,
+    iter_speech_chunks,
+    stream_speech,
+    to_pcm16,
+)
+
+
+class FakeWebSocket:
+    def __init__(self, messages):
+        self.incoming = [json.dumps(message) for message in messages]
+        self.sent = []
+
+    def receive(self):
+        return self.incoming.pop(0) if self.incoming else None
+
+    def send(self, data):
+        self.sent.append(data)
+
+    def events(self):
+        return [json.loads(frame) for frame in self.sent if isinstance(frame, str)]
+
+
+class TestTextDeltaBuffer(unittest.TestCase):
+    def test_sentence_released_when_complete(self):
+        """
+        Test that a sentence is released only once followed by whitespace.
+        """
+        buffer = TextDeltaBuffer()
+        self.assertEqual(buffer.feed("Pi is 3."), [])
+        self.assertEqual(buffer.feed("14. Next"), ["Pi is 3.14."])
+        self.assertEqual(buffer.feed(" one? "), ["Next one?"])
+
+    def test_clause_requires_min_length(self):
+        """
+        Test that clause boundaries only split spans that are long enough.
+        """
+        buffer = TextDeltaBuffer(min_clause_chars=20)
+        self.assertEqual(buffer.feed("Well, "), [])
+        self.assertEqual(
+            buffer.feed("this clause is long enough, and "),
+            ["Well, this clause is long enough,"],
+        )
+        self.assertEqual(buffer.flush(), ["and"])
+        self.assertEqual(buffer.flush(), [])
+
+    def test_force_split_at_max_chars(self):
+        """
+        Test that text without boundaries is split at whitespace past max_chars.
+        """
+        buffer = TextDeltaBuffer(max_chars=10)
+        self.assertEqual(buffer.feed("aaaa bbbb cccc"), ["aaaa bbbb"])
+
+
+class TestStreamSpeech(unittest.TestCase):
+    def setUp(self):
+        self.synthesizer = MagicMock()
+        self.synthesizer.synthesize.side_effect = (
+            lambda text, voice=None, speed=1.0: np.zeros(len(text), dtype=np.float32)
+        )
+
+    def test_spans_voiced_as_text_arrives(self):
+        """
+        Test that each completed span is synthesized and sent before close.
+        """
+        ws = FakeWebSocket([
+            {"type": "text", "text": "Hello there. How"},
+            {"type": "config", "speed": 1.25},
+            {"type": "text", "text": " are you"},
+            {"type": "close"},
+        ])
+        stream_speech(ws, self.synthesizer, voice="af_sky")
+
+        events = ws.events()
+        self.assertEqual([e["type"] for e in events], ["audio", "audio", "done"])
+        self.assertEqual(events[0]["text"], "Hello there.")
+        self.assertEqual(events[1]["text"], "How are you")
+        self.assertEqual(ws.sent[1], to_pcm16(np.zeros(len("Hello there."))))
+        self.synthesizer.synthesize.assert_called_with("How are you", voice="af_sky", speed=1.25)
+
+    def test_chunk_buffers_tracked(self):
+        """
+        Test that each sentence's encoding buffers are tracked and its chunk is held until the next is requested.
+        """
+        tracker = RequestMemoryTracker()
+        chunks = iter_speech_chunks(self.synthesizer, "Hello there. Bye.", tracker=tracker)
+
+        first = next(chunks)
+        self.assertEqual(len(first), len("Hello there.") * 2)
+        self.assertEqual(tracker.current_bytes, len(first))
+        self.assertEqual(tracker.peak_bytes, len("Hello there.") * (4 + PCM16_ENCODE_BYTES_PER_SAMPLE))
+        self.assertEqual(len(list(chunks)), 1)
+        self.assertEqual(tracker.current_bytes, 0)
+
+    def test_errors_do_not_end_session(self):
+        """
+        Test that invalid messages and synthesis failures are reported and the session continues.
+        """
+        self.synthesizer.synthesize.side_effect = RuntimeError("Invalid voice")
+        ws = FakeWebSocket([
+            {"type": "bogus"},
+            {"type": "text", "text": None},
+            {"type": "config", "voice": ["af_sky"], "speed": 0},
+            {"type": "text", "text": "Hi."},
+            {"type": "flush"},
+        ])
+        stream_speech(ws, self.synthesizer)
+
+        self.assertEqual([e["type"] for e in ws.events()], ["error", "error", "error", "error", "error", "flushed"])
+        self.assertEqual(ws.events()[1]["error"], "Invalid 'text' value")
+        self.synthesizer.synthesize.assert_called_once_with("Hi.", voice=None, speed=1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
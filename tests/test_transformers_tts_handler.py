@@ -0,0 +1,136 @@
+import os
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+import torch
+
+# utils (for getenv_bool) refuses to import without an API key
+with patch.dict(os.environ, {"API_KEY": os.getenv("API_KEY") or "test-api-key"}):
+    from openai_kokoro_tts.transformers_tts_handler import TransformersTTSHandler
+
+
+def fake_phonemes_to_audio(phonemes, voice=None, speed=1.0):
+    return np.zeros(int(len(phonemes) * 100 / speed), dtype=np.float32)
+
+
+class TestTransformersTTSHandler(unittest.TestCase):
+    def make_handler(self, env=None, mock_tokenizer_cls=None, mock_model_cls=None, vocoder=True):
+        tokenizer = MagicMock()
+        tokenizer.pad_token = None
+        tokenizer.side_effect = lambda texts, **kwargs: MagicMock(
+            to=lambda device: {"input_ids": torch.zeros((len(texts), 4), dtype=torch.long)}
+        )
+        tokenizer.batch_decode.side_effect = lambda output, **kwargs: ["abc"] * output.shape[0]
+        mock_tokenizer_cls.from_pretrained.return_value = tokenizer
+
+        model = MagicMock()
+        model.to.return_value = model
+        model.generate.side_effect = lambda **inputs: torch.zeros(
+            (inputs["input_ids"].shape[0], 8), dtype=torch.long
+        )
+        mock_model_cls.from_pretrained.return_value = model
+
+        with patch.dict(os.environ, env or {}):
+            handler = TransformersTTSHandler()
+        if vocoder:
+            handler._phonemes_to_audio = MagicMock(side_effect=fake_phonemes_to_audio)
+        return handler
+
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoModelForCausalLM")
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoTokenizer")
+    def test_generate_speech_returns_ndarray(self, mock_tokenizer_cls, mock_model_cls):
+        """
+        Test that speech is returned in memory as float32 samples scaled by speed.
+        """
+        handler = self.make_handler(mock_tokenizer_cls=mock_tokenizer_cls, mock_model_cls=mock_model_cls)
+        audio = handler.generate_speech("Hello", speed=2.0)
+        self.assertIsInstance(audio, np.ndarray)
+        self.assertEqual(audio.dtype, np.float32)
+        self.assertEqual(audio.size, 150)
+        self.assertEqual(handler.tokenizer.pad_token, handler.tokenizer.eos_token)
+
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoModelForCausalLM")
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoTokenizer")
+    def test_concurrent_requests_batched(self, mock_tokenizer_cls, mock_model_cls):
+        """
+        Test that concurrent requests are generated together in one padded batch.
+        """
+        handler = self.make_handler(
+            {"TRANSFORMERS_BATCH_MAX_SIZE": "4", "TRANSFORMERS_BATCH_MAX_WAIT_MS": "2000"},
+            mock_tokenizer_cls, mock_model_cls,
+        )
+        results = []
+        threads = [
+            threading.Thread(target=lambda i=i: results.append(handler.synthesize(f"text {i}")))
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(results), 4)
+        handler.model.generate.assert_called_once()
+        texts = handler.tokenizer.call_args[0][0]
+        self.assertEqual(sorted(texts), [f"text {i}" for i in range(4)])
+        self.assertTrue(handler.tokenizer.call_args[1]["padding"])
+
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoModelForCausalLM")
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoTokenizer")
+    def test_generation_failure(self, mock_tokenizer_cls, mock_model_cls):
+        """
+        Test that a failed batch surfaces as a RuntimeError and empty text as a ValueError.
+        """
+        handler = self.make_handler(mock_tokenizer_cls=mock_tokenizer_cls, mock_model_cls=mock_model_cls)
+        handler.model.generate.side_effect = Exception("out of memory")
+        with self.assertRaises(RuntimeError):
+            handler.synthesize("Hello")
+        with self.assertRaises(ValueError):
+            handler.synthesize("")
+
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoModelForCausalLM")
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoTokenizer")
+    def test_voice_carried_into_batch(self, mock_tokenizer_cls, mock_model_cls):
+        """
+        Test that the requested voice reaches batch generation and unknown voices are rejected.
+        """
+        handler = self.make_handler(mock_tokenizer_cls=mock_tokenizer_cls, mock_model_cls=mock_model_cls)
+        self.assertEqual(handler.get_voices(), ["af_bella", "af_sky"])
+        self.assertEqual(handler.sample_rate, 24000)
+
+        handler.synthesize("Hello", voice="af_sky")
+        self.assertEqual(handler._phonemes_to_audio.call_args[0][1], "af_sky")
+
+        with self.assertRaises(ValueError):
+            handler.synthesize("Hello", voice="invalid_voice")
+
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoModelForCausalLM")
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoTokenizer")
+    def test_missing_vocoder_raises(self, mock_tokenizer_cls, mock_model_cls):
+        """
+        Test that synthesis fails explicitly rather than returning placeholder audio.
+        """
+        handler = self.make_handler(mock_tokenizer_cls=mock_tokenizer_cls, mock_model_cls=mock_model_cls,
+                                    vocoder=False)
+        with self.assertRaises(RuntimeError) as raised:
+            handler.synthesize("Hello")
+        self.assertIsInstance(raised.exception.__cause__, NotImplementedError)
+
+    @patch("openai_kokoro_tts.transformers_tts_handler.torch.ao.quantization.quantize_dynamic")
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoModelForCausalLM")
+    @patch("openai_kokoro_tts.transformers_tts_handler.AutoTokenizer")
+    def test_dynamic_quantization(self, mock_tokenizer_cls, mock_model_cls, mock_quantize):
+        """
+        Test that linear layers are quantized to int8 when enabled on CPU.
+        """
+        with patch("openai_kokoro_tts.transformers_tts_handler.torch.cuda.is_available", return_value=False):
+            handler = self.make_handler({"TRANSFORMERS_QUANTIZE": "true"}, mock_tokenizer_cls, mock_model_cls)
+        mock_quantize.assert_called_once_with(
+            mock_model_cls.from_pretrained.return_value, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        self.assertIs(handler.model, mock_quantize.return_value)
+
+
+if __name__ == "__main__":
+    unittest.main()
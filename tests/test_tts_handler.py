@@ -0,0 +1,116 @@
+import os
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+from openai_kokoro_tts.tts_handler import TTSHandler
+
+
+class TestTTSHandler(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("openai_kokoro_tts.tts_handler.Kokoro", autospec=True)
+        self.mock_kokoro_cls = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.kokoro = self.mock_kokoro_cls.return_value
+        self.kokoro.get_voices.return_value = ["af_bella", "af_sky"]
+        self.kokoro.tokenizer = MagicMock()
+        self.kokoro.tokenizer.phonemize.side_effect = lambda text, lang: text.lower()
+        self.kokoro.create.side_effect = (
+            lambda phonemes, voice, speed, lang, is_phonemes=False: (
+                np.zeros(len(phonemes) * 240, dtype=np.float32), 24000
+            )
+        )
+
+        with patch("openai_kokoro_tts.tts_handler.os.path.isfile", return_value=True):
+            with patch.dict(os.environ, {"DEFAULT_VOICE": "af_sky"}):
+                self.handler = TTSHandler()
+
+    def test_generate_speech_in_memory(self):
+        """
+        Test that samples, sample rate and timings are returned without writing files.
+        """
+        samples, sample_rate, timings = self.handler.generate_speech("Hello.", "af_sky", "mp3", 1.2)
+        self.assertEqual(samples.shape, (6 * 240,))
+        self.assertEqual(sample_rate, 24000)
+        self.assertAlmostEqual(timings["audio_seconds"], 0.06)
+        self.assertIn("inference_seconds", timings)
+        self.kokoro.tokenizer.phonemize.assert_called_once_with("Hello.", "en-us")
+        self.kokoro.create.assert_called_once_with("hello.", "af_sky", 1.2, "en-us", is_phonemes=True)
+        self.assertFalse(os.path.exists("output.mp3"))
+
+    def test_stream_speech_by_sentence(self):
+        """
+        Test that streaming yields one chunk per sentence, synthesized lazily.
+        """
+        chunks = self.handler.stream_speech("First one. Second one!")
+        self.kokoro.create.assert_not_called()
+        self.assertEqual(next(chunks)[0].size, len("First one.") * 240)
+        self.assertEqual(len(list(chunks)), 1)
+        self.assertEqual(self.kokoro.create.call_count, 2)
+
+    def test_only_phonemization_serialized(self):
+        """
+        Test that phonemization never overlaps across threads while inference runs concurrently.
+        """
+        active = []
+        overlaps = []
+        inference = threading.Barrier(4, timeout=5)
+
+        def phonemize(text, lang):
+            active.append(1)
+            overlaps.append(len(active) > 1)
+            threading.Event().wait(0.01)
+            active.pop()
+            return text
+
+        def create(phonemes, voice, speed, lang, is_phonemes):
+            # Every thread must be inside inference at once for the barrier to release
+            inference.wait()
+            return np.zeros(10, dtype=np.float32), 24000
+
+        self.kokoro.tokenizer.phonemize.side_effect = phonemize
+        self.kokoro.create.side_effect = create
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.handler.synthesize("Hi.")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(overlaps, [False] * 4)
+        self.assertEqual(len(results), 4)
+
+    def test_phonemes_passed_to_older_kokoro_onnx(self):
+        """
+        Test that releases without is_phonemes receive the phonemes through the phonemes keyword.
+        """
+        kokoro = MagicMock()
+        kokoro.get_voices.return_value = ["af_bella"]
+        kokoro.tokenizer.phonemize.return_value = "hɛloʊ"
+        kokoro.create.return_value = (np.zeros(10, dtype=np.float32), 24000)
+        with patch("openai_kokoro_tts.tts_handler.Kokoro", return_value=kokoro), \
+                patch("openai_kokoro_tts.tts_handler.os.path.isfile", return_value=True), \
+                patch("openai_kokoro_tts.tts_handler.inspect.signature") as mock_signature:
+            mock_signature.return_value.parameters = {"text": None, "voice": None, "phonemes": None}
+            handler = TTSHandler()
+        handler.synthesize("Hello.", voice="af_bella")
+        kokoro.create.assert_called_once_with("Hello.", "af_bella", 1.0, "en-us", phonemes="hɛloʊ")
+
+    def test_invalid_input(self):
+        """
+        Test that empty text and unknown voices raise ValueError, and library failures RuntimeError.
+        """
+        with self.assertRaises(ValueError):
+            self.handler.generate_speech("")
+        with self.assertRaises(ValueError):
+            self.handler.generate_speech("Hi.", voice="nope")
+        self.kokoro.create.side_effect = Exception("espeak missing")
+        with self.assertRaises(RuntimeError):
+            self.handler.synthesize("Hi.")
+
+
+if __name__ == "__main__":
+    unittest.main()